@@ -1,9 +1,14 @@
+import argparse
 import sys
+import time
 from pathlib import Path
 from datetime import datetime
 from PySide6.QtWidgets import QApplication
 from ui.main_window import MainWindow
+from core.certificates import CertificateManager
+from core.health import HealthCheck, ProbeResult
 from config import NETWORK_FOLDER, ARCHIVE_FOLDER, EXCEL_FILE, CRYPTO_PRO_PATH
+from config import config
 
 def check_log_folder() -> tuple[bool, str]:
     """Проверка доступности папки логов"""
@@ -18,62 +23,111 @@ def check_log_folder() -> tuple[bool, str]:
     except Exception as e:
         return False, f"Ошибка проверки логов: {str(e)}"
 
-def verify_excel_columns(window: MainWindow) -> bool:
-    """Проверка структуры файла сотрудников"""
+def verify_excel_columns(window: MainWindow) -> tuple[bool, str]:
+    """Проверка структуры файла сотрудников (тем же разбором, что и EmployeeManager)"""
+    manager = window.copy_tab.employee_manager
     try:
-        import pandas as pd
-        df = pd.read_excel(EXCEL_FILE)
-        required_columns = ['Фамилия', 'ИО', 'ПК', 'Username']
-        missing = [col for col in required_columns if col not in df.columns]
-        
-        if missing:
-            window.copy_tab.log_signal.emit(
-                f"Ошибка: В файле отсутствуют столбцы: {', '.join(missing)}", 
-                "error"
-            )
-            return False
-        return True
+        data = manager.load()
+        report = data.report
+        phases = dict(report.get('phases', {}))  # Отчёт поколения общий - не изменяем его
+        if report.get('source') == 'snapshot':
+            # Данные из снимка: столбцы файла проверяются только по заголовку,
+            # полная сверка идёт в фоне, её ошибки EmployeeManager передаёт в журнал
+            started = time.perf_counter()
+            manager.check_columns()
+            phases['header'] = time.perf_counter() - started
     except Exception as e:
-        window.copy_tab.log_signal.emit(
-            f"Ошибка проверки файла: {str(e)}", 
-            "error"
-        )
-        return False
+        return False, f"Ошибка проверки файла: {str(e)}"
+    
+    source = "снимок" if report.get('source') == 'snapshot' else "Excel"
+    phase_names = {
+        'snapshot': "снимок", 'read': "чтение", 'header': "заголовок",
+        'parse': "разбор", 'index': "индексы",
+    }
+    timings = ", ".join(
+        f"{phase_names.get(name, name)} {duration:.2f} с"
+        for name, duration in phases.items()
+    )
+    return True, f"{len(data.records)} записей ({source}) | {timings}"
+
+def path_probe(path: Path):
+    """Проверка доступности пути для HealthCheck"""
+    def probe() -> tuple[bool, str]:
+        return (True, "") if path.exists() else (False, f"{path} недоступен")
+    return probe
 
 def run_startup_tests(window: MainWindow):
-    """Запуск тестов системы при старте"""
-    tests = [
-        ("Доступ к сетевой папке сертификатов", NETWORK_FOLDER.exists()),
-        ("Доступ к архиву сертификатов", ARCHIVE_FOLDER.exists()),
-        ("Доступ к файлу сотрудников", EXCEL_FILE.exists()),
-        ("Доступ к Crypto Pro", CRYPTO_PRO_PATH.exists()),
-    ]
+    """Запуск тестов системы при старте: параллельно, в фоне, со сроком на каждую проверку"""
+    log = window.copy_tab.log_signal.emit
     
-    log_status, log_msg = check_log_folder()
-    tests.append(("Проверка папки логов", log_status))
+    def on_result(result: ProbeResult):
+        latency = f"{result.latency * 1000:.0f} мс"
+        if result.ok:
+            details = f": {result.message}" if result.message else ""
+            log(f"Успех: {result.name}{details} ({latency})", "success")
+        else:
+            log(f"Ошибка: {result.name}: {result.message} ({latency})", "error")
     
-    window.copy_tab.log_signal.emit("=== Запуск тестов системы ===", "info")
-    for name, result in tests:
-        status = "Успех" if result else "Ошибка"
-        msg_type = "success" if result else "error"
-        window.copy_tab.log_signal.emit(f"{status}: {name}", msg_type)
+    def on_done(results: list, elapsed: float):
+        failed = sum(not result.ok for result in results)
+        log(f"=== Тесты завершены за {elapsed:.2f} с, ошибок: {failed} ===", "info")
     
-    if log_status:
-        window.copy_tab.log_signal.emit(f"Инфо: {log_msg}", "info")
+    timeout = config.HEALTH_PROBE_TIMEOUT
+    check = HealthCheck(on_result, on_done)
+    check.add("Доступ к сетевой папке сертификатов", path_probe(NETWORK_FOLDER), timeout)
+    check.add("Доступ к архиву сертификатов", path_probe(ARCHIVE_FOLDER), timeout)
+    check.add("Доступ к файлу сотрудников", path_probe(EXCEL_FILE), timeout)
+    check.add("Доступ к Crypto Pro", path_probe(CRYPTO_PRO_PATH), timeout)
+    check.add("Проверка папки логов", check_log_folder, timeout)
+    check.add("Файл сотрудников", lambda: verify_excel_columns(window), config.HEALTH_EXCEL_TIMEOUT)
     
-    verify_excel_columns(window)
-    window.copy_tab.log_signal.emit("=== Тесты завершены ===", "info")
+    log("=== Запуск тестов системы ===", "info")
+    check.start()
+
+def parse_args(argv: list) -> tuple[argparse.Namespace, list]:
+    """Аргументы приложения; нераспознанные остаются для Qt"""
+    parser = argparse.ArgumentParser(description="CertManager Pro")
+    parser.add_argument("--expiring-report", type=Path, metavar="FILE",
+                        help="построить отчёт об истекающих сертификатах (.csv или .xlsx) без окна")
+    parser.add_argument("--days", type=int, default=config.REPORT_DAYS,
+                        help="горизонт отчёта, дней (по умолчанию %(default)s)")
+    parser.add_argument("--include-expired", action="store_true",
+                        help="включить в отчёт уже истёкшие сертификаты")
+    return parser.parse_known_args(argv)
+
+def run_expiring_report(args: argparse.Namespace) -> int:
+    """Отчёт об истекающих сертификатах без GUI"""
+    def progress(clients: int, rows: int):
+        print(f"\rКлиентов: {clients}, истекающих: {rows}", end="", flush=True)
+    
+    try:
+        result = CertificateManager.expiring_report(
+            args.expiring_report, args.days, args.include_expired, on_progress=progress
+        )
+    except Exception as e:
+        print(f"\nОшибка построения отчёта: {str(e)}", file=sys.stderr)
+        return 1
+    
+    stats = result["crawl"]
+    print(f"\nОтчёт сохранён: {result['path']} ({result['rows']} строк, {stats.summary()})")
+    for path, error in stats.errors:
+        print(f"Недоступно: {path}: {error}", file=sys.stderr)
+    return 0
 
 def main():
-    app = QApplication(sys.argv)
+    args, qt_args = parse_args(sys.argv[1:])
+    if args.expiring_report:
+        sys.exit(run_expiring_report(args))
+    
+    app = QApplication(sys.argv[:1] + qt_args)
     
     # Применяем стили ко всему приложению
     app.setStyle("Fusion")  # Используем Fusion стиль как основу
     
     window = MainWindow()
-    run_startup_tests(window)
-    
     window.show()
+    run_startup_tests(window)  # Результаты приходят в журнал по мере готовности
+    
     sys.exit(app.exec())
 
 if __name__ == "__main__":
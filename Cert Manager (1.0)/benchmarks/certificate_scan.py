@@ -0,0 +1,133 @@
+# benchmarks/certificate_scan.py
+"""
+get_certificates: старый вариант (iterdir + is_dir + stat + stat в сортировке)
+против os.scandir. Каждое обращение к метаданным считается сетевым запросом
+и задерживается на --latency мс, как при работе с SMB-шарой.
+
+Запуск из папки приложения:
+    python benchmarks/certificate_scan.py --certs 200 --latency 2
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.certificates import CertificateManager
+from config import config
+
+
+def legacy_get_certificates(client_path: Path):
+    """Прежняя реализация CertificateManager.get_certificates"""
+    if not client_path.exists():
+        return []
+    expiry_date = datetime.now() - timedelta(days=config.CERT_EXPIRY_DAYS)
+    certs = []
+    for cert_dir in client_path.iterdir():
+        if cert_dir.is_dir():
+            mod_time = datetime.fromtimestamp(cert_dir.stat().st_mtime)
+            status = "valid" if mod_time >= expiry_date else "expired"
+            certs.append({
+                "path": cert_dir,
+                "name": cert_dir.name,
+                "status": status,
+                "date": mod_time.strftime("%d.%m.%Y %H:%M"),
+                "full_path": str(cert_dir)
+            })
+    return sorted(certs, key=lambda x: x["path"].stat().st_mtime, reverse=True)
+
+
+class SlowFilesystem:
+    """Подмена os.stat/os.listdir/os.scandir со счётчиком и задержкой"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.round_trips = 0
+        self._originals = {}
+
+    def _hit(self):
+        self.round_trips += 1
+        time.sleep(self.latency)
+
+    def _wrap(self, fn):
+        def wrapper(*args, **kwargs):
+            self._hit()
+            return fn(*args, **kwargs)
+        return wrapper
+
+    def _scandir(self, path):
+        self._hit()
+        fs = self
+
+        class Entry:
+            def __init__(self, entry):
+                self._entry = entry
+                self.name = entry.name
+                self.path = entry.path
+
+            def is_dir(self):
+                return self._entry.is_dir()
+
+            def stat(self):
+                # В Windows DirEntry.stat() берёт данные из списка папки без запроса
+                if sys.platform != "win32":
+                    fs._hit()
+                return self._entry.stat()
+
+        class Scandir:
+            def __init__(self, it):
+                self._it = it
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                self._it.close()
+
+            def __iter__(self):
+                return (Entry(entry) for entry in self._it)
+
+        return Scandir(self._originals["scandir"](path))
+
+    def __enter__(self):
+        for name in ("stat", "listdir", "scandir"):
+            self._originals[name] = getattr(os, name)
+        os.stat = self._wrap(self._originals["stat"])
+        os.listdir = self._wrap(self._originals["listdir"])
+        os.scandir = self._scandir
+        return self
+
+    def __exit__(self, *exc):
+        for name, fn in self._originals.items():
+            setattr(os, name, fn)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--certs', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=2.0, help="задержка запроса, мс")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        client = Path(tmp) / "client"
+        for i in range(args.certs):
+            (client / f"cert_{i:04d}.000").mkdir(parents=True)
+            (client / f"cert_{i:04d}.000" / "header.key").write_bytes(b"x")
+
+        print(f"{args.certs} контейнеров, задержка {args.latency} мс, платформа {sys.platform}")
+        for title, fn in [("iterdir/stat", legacy_get_certificates),
+                          ("scandir", CertificateManager.get_certificates)]:
+            with SlowFilesystem(args.latency / 1000) as fs:
+                started = time.perf_counter()
+                certs = fn(client)
+                elapsed = time.perf_counter() - started
+            assert len(certs) == args.certs
+            print(f"{title:<14} запросов: {fs.round_trips:>6}   время: {elapsed:.3f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# benchmarks/container_copy.py
+"""
+Копирование контейнера: shutil.copytree (прежний вариант) против
+CertificateManager.copy_certificate - напрямую и заданием CopyEngine
+(с учётом накладных расходов движка). Каждая операция с файловой системой
+(open, stat, mkdir, utime, chmod, rename, scandir) задерживается на
+--latency мс, как запрос к удалённой c$-шаре.
+
+Запуск из папки приложения:
+    python benchmarks/container_copy.py --files 6 50 --latency 5
+"""
+import argparse
+import builtins
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import core.certificates
+from core.certificates import CertificateManager
+from core.copy_engine import CopyEngine, JobState
+
+PATCHED = ("stat", "lstat", "mkdir", "utime", "chmod", "rename", "scandir")
+
+
+class SlowFilesystem:
+    """Задержка и счётчик на каждую операцию с файловой системой"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.round_trips = 0
+        self._lock = threading.Lock()
+        self._originals = {}
+
+    def _wrap(self, fn):
+        def wrapper(*args, **kwargs):
+            with self._lock:
+                self.round_trips += 1
+            time.sleep(self.latency)  # sleep отпускает GIL, как настоящий сетевой вызов
+            return fn(*args, **kwargs)
+        wrapper.__wrapped__ = fn
+        return wrapper
+
+    def __enter__(self):
+        for name in PATCHED:
+            self._originals[name] = getattr(os, name)
+            setattr(os, name, self._wrap(self._originals[name]))
+        # shutil и core.certificates открывают файлы через builtins.open
+        shutil.open = core.certificates.open = self._wrap(builtins.open)
+        return self
+
+    def __exit__(self, *exc):
+        for name, fn in self._originals.items():
+            setattr(os, name, fn)
+        del shutil.open
+        del core.certificates.open
+
+
+def make_container(path: Path, files: int, size: int):
+    path.mkdir(parents=True)
+    for i in range(files):
+        (path / f"file{i:03d}.key").write_bytes(os.urandom(size))
+
+
+def copy_with_engine(src: Path, dest: Path):
+    """Копирование фоновым заданием, как из CopyView"""
+    done = threading.Event()
+    engine = CopyEngine(CertificateManager.copy_certificate, max_workers=1,
+                        on_finished=lambda job: done.set())
+    job = engine.submit(src, dest)
+    done.wait()
+    engine.shutdown()
+    assert job.state == JobState.DONE, job.message
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, nargs='+', default=[6, 50])
+    parser.add_argument('--size', type=int, default=4096, help="размер файла, байт")
+    parser.add_argument('--latency', type=float, default=5.0, help="задержка операции, мс")
+    args = parser.parse_args()
+
+    print(f"задержка {args.latency} мс, файл {args.size} байт, платформа {sys.platform}")
+    print(f"{'файлов':>7} {'способ':<16}{'операций':>10}{'время, с':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for files in args.files:
+            src = Path(tmp) / f"src{files}" / "container.000"
+            make_container(src, files, args.size)
+            for title, copy in [
+                ("copytree", lambda dest: shutil.copytree(src, dest)),
+                ("copy_certificate", lambda dest: CertificateManager.copy_certificate(src, dest)),
+                ("CopyEngine", lambda dest: copy_with_engine(src, dest)),
+            ]:
+                dest = Path(tmp) / f"dest_{title}_{files}" / "Crypto Pro" / "container.000"
+                dest.parent.mkdir(parents=True)
+                with SlowFilesystem(args.latency / 1000) as fs:
+                    started = time.perf_counter()
+                    copy(dest)
+                    elapsed = time.perf_counter() - started
+                assert len(os.listdir(dest)) == files
+                print(f"{files:>7} {title:<16}{fs.round_trips:>10}{elapsed:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# benchmarks/employee_memory.py
+"""
+Сравнение памяти: список словарей (to_dict('records')) и компактные записи Employee.
+
+Запуск из папки приложения:
+    python benchmarks/employee_memory.py --rows 50000
+"""
+import argparse
+import gc
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+from core.employees import EmployeeManager
+
+# Лишние столбцы, которые есть в реальной базе, но не нужны приложению
+EXTRA_COLUMNS = ['Отдел', 'Должность', 'Email', 'Мобильный', 'Дата рождения',
+                 'Дата приема', 'Руководитель', 'Адрес', 'Примечание']
+
+
+def make_workbook(path: Path, rows: int):
+    """Генерация синтетической базы сотрудников"""
+    rnd = random.Random(42)
+    surnames = [f"Фамилия{i}" for i in range(rows // 3 or 1)]
+    data = {
+        'Фамилия': [rnd.choice(surnames) for _ in range(rows)],
+        'ИО': [f"{rnd.choice('АБВГДЕИКМНОП')}.{rnd.choice('АБВГДЕИКМНОП')}." for _ in range(rows)],
+        'ПК': [f"NUC{rnd.randint(1, rows):05d}" for _ in range(rows)],
+        'Username': [f"user{i}" for i in range(rows)],
+        'ВН': [str(rnd.randint(100, 999)) for _ in range(rows)],
+        'Каб.': [str(rnd.randint(1, 500)) for _ in range(rows)],
+    }
+    for column in EXTRA_COLUMNS:
+        data[column] = [f"{column} {rnd.randint(1, 10_000)}" for _ in range(rows)]
+    pd.DataFrame(data).to_excel(path, index=False)
+
+
+def measure(fn):
+    """Возвращает (результат, удерживаемая память, пиковая память) в байтах"""
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak
+
+
+def mb(value: int) -> str:
+    return f"{value / 1024 / 1024:8.1f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=50_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "employees.xlsx"
+        snapshot = Path(tmp) / "employees.snapshot"  # Рабочий снимок приложения не трогаем
+        started = time.perf_counter()
+        make_workbook(path, args.rows)
+        print(f"Книга на {args.rows} строк создана за {time.perf_counter() - started:.1f} с")
+
+        def load_dicts():
+            """Старая загрузка: DataFrame со всеми столбцами -> list[dict]"""
+            df = pd.read_excel(path, dtype=str)
+            df.fillna("", inplace=True)
+            return df.to_dict('records')
+
+        def load_records():
+            """Новая загрузка без индексов: только нужные столбцы -> list[Employee]"""
+            return EmployeeManager._records_from_rows(
+                EmployeeManager(path, snapshot)._read_table()[1]
+            )
+
+        def load_manager():
+            """Полная загрузка EmployeeManager: записи + индексы поиска"""
+            manager = EmployeeManager(path, snapshot)
+            manager.employees
+            return manager
+
+        results = []
+        for title, loader in [("list[dict]", load_dicts),
+                              ("list[Employee]", load_records),
+                              ("EmployeeManager", load_manager)]:
+            started = time.perf_counter()
+            result, current, peak = measure(loader)
+            elapsed = time.perf_counter() - started
+            results.append((title, current, peak, elapsed))
+            del result
+
+    print(f"{'':20}{'удержано':>11}{'пик':>11}{'время':>9}")
+    for title, current, peak, elapsed in results:
+        print(f"{title:20}{mb(current)}{mb(peak)}{elapsed:8.2f}с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/excel_readers.py
+"""
+Сравнение движков чтения базы сотрудников: время разбора и пиковая память.
+
+Запуск из папки приложения:
+    python benchmarks/excel_readers.py --rows 1000 10000 50000
+
+Пиковая память считается через tracemalloc и не включает нативные
+выделения (calamine работает в Rust, его цифра занижена).
+"""
+import argparse
+import gc
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from openpyxl import Workbook
+from core.employees import Employee
+from core.excel_readers import READERS
+
+EXTRA_COLUMNS = ['Отдел', 'Должность', 'Email', 'Мобильный', 'Дата рождения',
+                 'Дата приема', 'Руководитель', 'Адрес', 'Примечание']
+
+
+def make_workbook(path: Path, rows: int):
+    """Синтетическая база: нужные столбцы + лишние, как в реальном файле"""
+    rnd = random.Random(42)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(list(Employee.FIELDS) + EXTRA_COLUMNS)
+    for i in range(rows):
+        sheet.append(
+            [f"Фамилия{rnd.randint(1, rows // 3 + 1)}", "И.О.", f"NUC{i:05d}", f"user{i}",
+             rnd.randint(100, 999), rnd.randint(1, 500)]
+            + [f"{column} {rnd.randint(1, 10_000)}" for column in EXTRA_COLUMNS]
+        )
+    workbook.save(path)
+
+
+def bench(fn, repeat: int):
+    """Лучшее время из repeat запусков и пиковая память отдельного запуска"""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000, 50_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    readers = [cls() for cls in READERS.values() if cls.is_available()]
+    print(f"{'строк':>7} {'движок':<10}{'таблица, с':>12}{'пик, MB':>10}{'заголовок, с':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            path = Path(tmp) / f"employees_{rows}.xlsx"
+            make_workbook(path, rows)
+            data = path.read_bytes()
+            for reader in readers:
+                elapsed, peak = bench(lambda: reader.read_table(data, Employee.FIELDS), args.repeat)
+                header_time, _ = bench(lambda: reader.read_header(data), args.repeat)
+                print(f"{rows:>7} {reader.name:<10}{elapsed:>12.3f}{peak / 1024 / 1024:>10.1f}{header_time:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
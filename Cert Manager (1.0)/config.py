@@ -10,10 +10,43 @@ class Config:
     ARCHIVE_FOLDER = Path(r" ") # Архив клиентов
     EXCEL_FILE = Path(r" ") # Excel база сотрудников
     LOG_FOLDER = Path(r" ") # Логи установки сертификатов
+    CACHE_FOLDER = Path(os.environ.get("LOCALAPPDATA", Path.home())) / "CertManager" # Локальные снимки и кэши
 
     # Настройки приложения
     CERT_EXPIRY_DAYS = 490  # ~15 месяцев в днях
     MAX_LOG_ENTRIES = 1000 
+    COMPLETER_LIMIT = 50  # Максимум подсказок автодополнения
+    COMPLETER_DEBOUNCE_MS = 150  # Пауза в наборе перед запросом подсказок, мс
+    EXCEL_READER = "auto"  # Движок чтения Excel: auto | openpyxl | calamine | pandas
+    EMPLOYEE_RELOAD_INTERVAL = 60  # Период опроса файла сотрудников, сек (0 - не следить)
+    CLIENTS_CACHE_TTL = 300  # Время жизни результатов поиска клиентов, сек
+    CLIENTS_CACHE_SIZE = 100  # Максимум запросов в кэше поиска клиентов
+    CRAWLER_MAX_WORKERS = 8  # Одновременных сканирований папок клиентов на NAS
+    SEARCH_BATCH_SIZE = 50  # Результатов поиска в одной порции для списка
+    COPY_WORKERS = 2  # Одновременных заданий копирования
+    COPY_TIMEOUT = 120  # Предельное время копирования одного контейнера, сек
+    COPY_FILE_WORKERS = 4  # Параллельно копируемых файлов внутри контейнера
+    COPY_BUFFER_SIZE = 1024 * 1024  # Буфер копирования файла, байт
+    FINGERPRINT_CACHE_SIZE = 5000  # Максимум хэшей файлов контейнеров в кэше
+    FINGERPRINT_CACHE_TTL = 3600  # Время жизни хэша файла в кэше, сек
+    SOURCE_CACHE_MAX_MB = 200  # Локальный кэш копируемых контейнеров, МБ (0 - отключить)
+    TRASH_DIR = ".certmanager-trash"  # Скрытая корзина в корне шары (\\PC\c$\...)
+    TRASH_RETENTION_HOURS = 72  # Сколько хранить удалённые контейнеры в корзине
+    TRASH_SWEEP_INTERVAL = 3600  # Период очистки корзин, сек
+    HISTORY_SIZE = 20  # Глубина истории отмены/повтора
+    PURGE_MAX_WORKERS = 4  # Параллельных удалений при очистке просроченных
+    REPORT_DAYS = 30  # Горизонт отчёта об истекающих сертификатах, дней
+    HEALTH_PROBE_TIMEOUT = 5  # Срок проверки доступности пути при запуске, сек
+    HEALTH_EXCEL_TIMEOUT = 60  # Срок загрузки файла сотрудников при запуске, сек
+    HOST_PROBE_PORT = 445  # Порт SMB для проверки доступности ПК
+    HOST_PROBE_TIMEOUT = 0.5  # Срок проверки доступности ПК, сек
+    HOST_UP_TTL = 30  # Сколько доступный ПК не проверяется повторно, сек
+    HOST_DOWN_TTL = 30  # Сколько недоступный ПК не проверяется повторно, сек
+    HOST_DOWN_TTL_MAX = 300  # Предел срока при повторных отказах, сек
+    PATH_CACHE_TTL = 2  # Время жизни кэша exists/is_dir/stat сетевых путей, сек
+    PATH_CACHE_SIZE = 2000  # Максимум путей в кэше метаданных
+    CATALOG_RECHECK_AGE = 600  # Клиенты из результатов поиска старше этого перепроверяются в фоне, сек
+    CATALOG_RECHECK_LIMIT = 50  # Максимум клиентов на фоновую перепроверку за один поиск
 
     @classmethod
     def validate_paths(cls):
@@ -0,0 +1,120 @@
+# core/cache.py
+import errno
+import os
+import stat
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional, Union
+
+from config import config
+
+MISSING = object()  # Признак промаха (None может быть значением)
+
+
+class TTLCache:
+    """Кэш с ограничением по размеру (LRU) и времени жизни записей.
+
+    К записи можно привязать token (например, mtime папки): если при чтении
+    передан другой token, запись считается устаревшей.
+    """
+
+    def __init__(self, maxsize: int = 100, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def get(self, key: Hashable, token: Any = None) -> Any:
+        """Значение из кэша или MISSING"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            value, expires_at, entry_token = entry
+            if time.monotonic() >= expires_at or entry_token != token:
+                del self._data[key]
+                self.stale += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, token: Any = None):
+        """Сохранение значения (самые старые записи вытесняются)"""
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl, token)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Сброс одной записи или всего кэша"""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Статистика обращений"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "stale": self.stale, "size": len(self._data)}
+
+
+class PathMetadataCache(TTLCache):
+    """Кэш stat() сетевых путей на короткое время (exists/is_dir/stat).
+
+    Отсутствие пути тоже запоминается. Прочие ошибки (сеть, права) не
+    кэшируются. Собственные записи приложения сбрасывают запись пути,
+    его родителя и всех вложенных путей через invalidate_path.
+    """
+
+    @staticmethod
+    def _path_key(path: Union[str, Path]) -> str:
+        return os.path.normcase(os.path.normpath(os.fspath(path)))
+
+    def stat(self, path: Union[str, Path]) -> os.stat_result:
+        """os.stat с кэшем; FileNotFoundError, если пути нет"""
+        key = self._path_key(path)
+        st = self.get(key)
+        if st is MISSING:
+            try:
+                st = os.stat(path)
+            except (FileNotFoundError, NotADirectoryError):
+                st = None
+            self.put(key, st)
+        if st is None:
+            raise FileNotFoundError(errno.ENOENT, "Путь не найден", str(path))
+        return st
+
+    def exists(self, path: Union[str, Path]) -> bool:
+        try:
+            self.stat(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def is_dir(self, path: Union[str, Path]) -> bool:
+        try:
+            return stat.S_ISDIR(self.stat(path).st_mode)
+        except FileNotFoundError:
+            return False
+
+    def invalidate_path(self, path: Union[str, Path]):
+        """Сброс после записи: сам путь, вложенные пути и родитель (его mtime изменился)"""
+        key = self._path_key(path)
+        prefix = key.rstrip(os.sep) + os.sep
+        parent = os.path.dirname(key)
+        with self._lock:
+            for cached in [k for k in self._data if k == key or k == parent or k.startswith(prefix)]:
+                del self._data[cached]
+
+
+# Общий кэш метаданных путей для core.certificates и core.employees
+path_cache = PathMetadataCache(maxsize=config.PATH_CACHE_SIZE, ttl=config.PATH_CACHE_TTL)
@@ -0,0 +1,256 @@
+# core/catalog.py
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from core.crawler import CrawlStats, crawl
+
+SCHEMA_VERSION = 2  # 2: время сканирования клиента (scanned_at)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS clients (
+    path TEXT PRIMARY KEY,
+    root TEXT NOT NULL,
+    name TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    scanned_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS certificates (
+    id INTEGER PRIMARY KEY,
+    client_path TEXT NOT NULL,
+    name TEXT NOT NULL,
+    name_folded TEXT NOT NULL,
+    path TEXT NOT NULL,
+    mtime REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS certificates_client ON certificates(client_path);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS certificates_fts USING fts5(
+    name, content='certificates', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS certificates_ai AFTER INSERT ON certificates BEGIN
+    INSERT INTO certificates_fts(rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS certificates_ad AFTER DELETE ON certificates BEGIN
+    INSERT INTO certificates_fts(certificates_fts, rowid, name) VALUES ('delete', old.id, old.name);
+END;
+"""
+
+
+class CertificateCatalog:
+    """Локальный каталог клиентов и контейнеров сертификатов (SQLite + FTS5).
+
+    Каталог переживает перезапуск и обновляется инкрементально: папка клиента
+    пересканируется, только если изменился её mtime. mtime папки клиента не
+    меняется при перезаписи файлов внутри контейнера, поэтому давно не
+    сканированные клиенты из результатов поиска перепроверяются в фоне
+    (schedule_rescan) - поиск их не ждёт.
+    """
+
+    def __init__(self, db_path: Path, scan_client: Callable[[Path], List[Dict]], max_workers: int = 8):
+        self.db_path = db_path
+        self.scan_client = scan_client  # client_path -> [{"name", "path", "mtime"}, ...]
+        self.max_workers = max_workers  # Параллельных сканирований папок клиентов
+        self._lock = threading.Lock()  # Обновляет каталог только один поток
+        self._fts = False
+        self._initialized = False
+        self._rescan_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="catalog-rescan")
+        self._rescan_pending = set()
+        self._rescan_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Отдельное соединение на каждую операцию - безопасно для любых потоков"""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        if not self._initialized:
+            self._init_schema(conn)
+        return conn
+
+    def _init_schema(self, conn: sqlite3.Connection):
+        """Создание таблиц; при смене версии схемы каталог строится заново"""
+        conn.execute("PRAGMA journal_mode=WAL")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            conn.executescript("""
+                DROP TABLE IF EXISTS certificates_fts;
+                DROP TABLE IF EXISTS certificates;
+                DROP TABLE IF EXISTS clients;
+            """)
+        conn.executescript(SCHEMA)
+        try:
+            conn.executescript(FTS_SCHEMA)
+            self._fts = True
+        except sqlite3.OperationalError:
+            # SQLite без FTS5/trigram - поиск подстроки по name_folded
+            self._fts = False
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+        self._initialized = True
+
+    def is_empty(self) -> bool:
+        """Каталог ещё ни разу не заполнялся"""
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT 1 FROM clients LIMIT 1").fetchone() is None
+
+    @staticmethod
+    def _list_clients(root: Path) -> List[Tuple[str, str, int]]:
+        """Папки клиентов в корне: (путь, имя, mtime_ns) за один проход scandir"""
+        with os.scandir(root) as entries:
+            return [
+                (entry.path, entry.name, entry.stat().st_mtime_ns)
+                for entry in entries if entry.is_dir()
+            ]
+
+    def refresh(self, roots: Iterable[Path], cancel: Optional[threading.Event] = None) -> Dict:
+        """Инкрементальное обновление: пересканируются только изменившиеся клиенты.
+
+        Изменившиеся папки сканируются параллельно (не больше max_workers
+        одновременно); в stats["crawl"] - пропускная способность обхода.
+        """
+        stats = self.new_stats()
+        for _ in self.refresh_iter(roots, stats, cancel):
+            pass
+        return stats
+
+    def new_stats(self) -> Dict:
+        """Пустая статистика для refresh_iter()"""
+        crawl_stats = CrawlStats(self.max_workers)
+        return {"clients": 0, "rescanned": 0, "removed": 0, "errors": crawl_stats.errors,
+                "crawl": crawl_stats}
+
+    def refresh_iter(self, roots: Iterable[Path], stats: Dict,
+                     cancel: Optional[threading.Event] = None) -> Iterator[Tuple[str, List]]:
+        """refresh() с выдачей (имя клиента, контейнеры) по мере сканирования.
+
+        Каждый клиент сохраняется до выдачи; при cancel обход останавливается,
+        а непросканированные клиенты обновятся в следующий раз.
+        """
+        crawl_stats = stats["crawl"]
+        with self._lock, closing(self._connect()) as conn:
+            for root in roots:
+                if cancel and cancel.is_set():
+                    break
+                try:
+                    clients = self._list_clients(root)
+                except OSError as e:
+                    # Корень недоступен - оставляем то, что уже есть в каталоге
+                    stats["errors"].append((str(root), str(e)))
+                    continue
+
+                known = dict(conn.execute(
+                    "SELECT path, mtime_ns FROM clients WHERE root = ?", (str(root),)
+                ))
+                stats["clients"] += len(clients)
+                changed = {}
+                for path, name, mtime_ns in clients:
+                    if known.pop(path, None) != mtime_ns:
+                        changed[Path(path)] = (path, name, mtime_ns)
+
+                # Запись в SQLite - в этом потоке, сканирование - в пуле. Каждый
+                # клиент фиксируется своей транзакцией до выдачи: прерванный
+                # поиск не откатывает уже просканированное
+                for folder, certs in crawl(changed, self.scan_client,
+                                           self.max_workers, crawl_stats, cancel):
+                    path, name, mtime_ns = changed[folder]
+                    with conn:
+                        self._store_client(conn, str(root), path, name, mtime_ns, certs)
+                    stats["rescanned"] += 1
+                    yield name, certs
+                with conn:
+                    for path in known:
+                        self._remove_client(conn, path)
+                        stats["removed"] += 1
+
+    def rescan_iter(self, client_paths: Iterable[str], stats: CrawlStats,
+                    cancel: Optional[threading.Event] = None) -> Iterator[Tuple[str, str, List]]:
+        """Повторное сканирование известных клиентов (один scandir на клиента).
+
+        Выдаёт (путь клиента, имя, контейнеры) и сохраняет свежий результат;
+        недоступные клиенты попадают в stats.errors и остаются как были.
+        """
+        with self._lock, closing(self._connect()) as conn:
+            known = {}
+            for path in client_paths:
+                row = conn.execute(
+                    "SELECT root, name, mtime_ns FROM clients WHERE path = ?", (path,)
+                ).fetchone()
+                if row is not None:
+                    known[Path(path)] = (path, *row)
+            for folder, certs in crawl(known, self.scan_client, self.max_workers, stats, cancel):
+                path, root, name, mtime_ns = known[folder]
+                with conn:
+                    self._store_client(conn, root, path, name, mtime_ns, certs)
+                yield path, name, certs
+
+    def schedule_rescan(self, client_paths: Iterable[str]):
+        """Фоновая перепроверка клиентов; уже запланированные не дублируются"""
+        with self._rescan_lock:
+            paths = [path for path in client_paths if path not in self._rescan_pending]
+            self._rescan_pending.update(paths)
+        if paths:
+            self._rescan_executor.submit(self._rescan, paths)
+
+    def _rescan(self, client_paths: List[str]):
+        try:
+            for _ in self.rescan_iter(client_paths, CrawlStats(self.max_workers)):
+                pass
+        except Exception:
+            pass  # Перепроверка повторится при следующем поиске
+        finally:
+            with self._rescan_lock:
+                self._rescan_pending.difference_update(client_paths)
+
+    @staticmethod
+    def _remove_client(conn: sqlite3.Connection, path: str):
+        conn.execute("DELETE FROM certificates WHERE client_path = ?", (path,))
+        conn.execute("DELETE FROM clients WHERE path = ?", (path,))
+
+    def _store_client(self, conn: sqlite3.Connection, root: str, path: str, name: str,
+                      mtime_ns: int, certs: List[Dict]):
+        """Замена записей клиента свежим результатом сканирования"""
+        self._remove_client(conn, path)
+        conn.execute(
+            "INSERT INTO clients (path, root, name, mtime_ns, scanned_at) VALUES (?, ?, ?, ?, ?)",
+            (path, root, name, mtime_ns, time.time())
+        )
+        conn.executemany(
+            "INSERT INTO certificates (client_path, name, name_folded, path, mtime) VALUES (?, ?, ?, ?, ?)",
+            [(path, cert["name"], cert["name"].casefold(), str(cert["path"]), cert["mtime"])
+             for cert in certs]
+        )
+
+    def search(self, query: str) -> List[Dict]:
+        """Контейнеры, в имени которых есть query (без учёта регистра)"""
+        return list(self.iter_search(query))
+
+    def iter_search(self, query: str) -> Iterator[Dict]:
+        """search() построчно, без загрузки всего результата в память"""
+        folded = query.casefold()
+        with closing(self._connect()) as conn:
+            if self._fts and len(folded) >= 3:
+                rows = conn.execute("""
+                    SELECT cl.path, cl.name, cl.scanned_at, c.name, c.path, c.mtime
+                    FROM certificates_fts f
+                    JOIN certificates c ON c.id = f.rowid
+                    JOIN clients cl ON cl.path = c.client_path
+                    WHERE certificates_fts MATCH ?
+                    ORDER BY cl.name, c.mtime DESC
+                """, ('"' + query.replace('"', '""') + '"',))
+            else:
+                rows = conn.execute("""
+                    SELECT cl.path, cl.name, cl.scanned_at, c.name, c.path, c.mtime
+                    FROM certificates c
+                    JOIN clients cl ON cl.path = c.client_path
+                    WHERE instr(c.name_folded, ?) > 0
+                    ORDER BY cl.name, c.mtime DESC
+                """, (folded,))
+            for client_path, client, scanned_at, name, path, mtime in rows:
+                yield {"client_path": client_path, "client": client, "scanned_at": scanned_at,
+                       "name": name, "path": Path(path), "mtime": mtime}
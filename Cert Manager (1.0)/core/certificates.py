@@ -1,79 +1,581 @@
+import os
 import shutil
 import subprocess
+import threading
+import time
+import uuid
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import Callable, List, Dict, Iterator, Optional, Tuple
 from config import NETWORK_FOLDER, ARCHIVE_FOLDER, CERT_EXPIRY_DAYS, CRYPTO_PRO_PATH
-from concurrent.futures import ThreadPoolExecutor
-from functools import lru_cache
+from config import config
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from core.cache import MISSING, TTLCache, path_cache
+from core.catalog import CertificateCatalog
+from core.copy_engine import CopyCancelled, CopyProgress, CopySkipped
+from core.crawler import CrawlStats, crawl
+from core.fingerprint import FingerprintCache, container_shape
+from core.hosts import HostMonitor, HostOffline
+from core.report import write_expiring_report
+from core.source_cache import SourceCache
+from core.trash import Trash, TrashItem
+
+try:
+    from _winapi import CopyFile2 as _COPY_FILE2  # shutil.copy2 использует его с Python 3.12
+except ImportError:
+    _COPY_FILE2 = None
+
+TEMP_PREFIX = ".certmanager-"  # Временные папки копирования рядом с хранилищем
+
+class Certificate:
+    """Контейнер сертификата: метаданные из одного прохода scandir"""
+    __slots__ = ('path', 'name', 'mtime', 'status')
+    KEYS = ('path', 'name', 'mtime', 'status', 'date', 'full_path')
+
+    def __init__(self, path: Path, name: str, mtime: float, status: str):
+        self.path = path
+        self.name = name
+        self.mtime = mtime
+        self.status = status
+
+    @property
+    def date(self) -> str:
+        return datetime.fromtimestamp(self.mtime).strftime("%d.%m.%Y %H:%M")
+
+    @property
+    def full_path(self) -> str:
+        return str(self.path)
+
+    def __getitem__(self, key: str):
+        """Доступ как к словарю (cert["status"]) - для существующего кода"""
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return self[key] if key in self.KEYS else default
+
+    def __repr__(self) -> str:
+        return f"Certificate({self.name!r}, {self.status}, {self.date})"
+
 
 class CertificateManager:
-    @staticmethod
-    @lru_cache(maxsize=100)
-    def find_clients(query: str) -> List[Path]:
+    _init_lock = threading.Lock()  # Однократное создание каталога, кэша и корзины из разных потоков
+    _catalog = None
+    last_crawl_stats: Optional[CrawlStats] = None  # Статистика последнего обновления каталога
+    _source_cache = None
+    _trash = None
+    _fingerprints = FingerprintCache(maxsize=config.FINGERPRINT_CACHE_SIZE, ttl=config.FINGERPRINT_CACHE_TTL)
+    _clients_cache = TTLCache(maxsize=config.CLIENTS_CACHE_SIZE, ttl=config.CLIENTS_CACHE_TTL)
+    hosts = HostMonitor(
+        port=config.HOST_PROBE_PORT,
+        timeout=config.HOST_PROBE_TIMEOUT,
+        up_ttl=config.HOST_UP_TTL,
+        down_ttl=config.HOST_DOWN_TTL,
+        max_down_ttl=config.HOST_DOWN_TTL_MAX
+    )
+    paths = path_cache  # exists/is_dir/stat сетевых путей с коротким TTL
+    
+    @classmethod
+    def _roots_signature(cls) -> Tuple:
+        """mtime корневых папок: новая папка клиента меняет mtime корня"""
+        signature = []
+        for folder in (NETWORK_FOLDER, ARCHIVE_FOLDER):
+            try:
+                signature.append(cls.paths.stat(folder).st_mtime_ns)
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    @classmethod
+    def find_clients(cls, query: str) -> Tuple[Path, ...]:
         query = query.lower()
-        results = []
+        signature = cls._roots_signature()
+        cached = cls._clients_cache.get(query, signature)
+        if cached is not MISSING:
+            return cached
         
-        def search_in_folder(folder: Path):
-            for item in folder.iterdir():
-                if item.is_dir() and query in item.name.lower():
-                    results.append(item)
+        def search_in_folder(folder: Path) -> List[Path]:
+            return [item for item in folder.iterdir()
+                    if item.is_dir() and query in item.name.lower()]
         
+        results = []
         with ThreadPoolExecutor() as executor:
-            executor.submit(search_in_folder, NETWORK_FOLDER)
-            executor.submit(search_in_folder, ARCHIVE_FOLDER)
-            
+            futures = [executor.submit(search_in_folder, NETWORK_FOLDER),
+                       executor.submit(search_in_folder, ARCHIVE_FOLDER)]
+            for future in futures:
+                try:
+                    results.extend(future.result())
+                except OSError:
+                    pass  # Недоступная папка, как и раньше, просто не даёт результатов
+        
+        results = tuple(results)
+        cls._clients_cache.put(query, results, signature)
         return results
 
+    @classmethod
+    def invalidate_clients_cache(cls):
+        """Сброс кэша поиска клиентов"""
+        cls._clients_cache.invalidate()
+
+    @classmethod
+    def clients_cache_stats(cls) -> Dict[str, int]:
+        """Статистика кэша поиска клиентов (hits, misses, stale, size)"""
+        return cls._clients_cache.stats()
+
+    @classmethod
+    def path_cache_stats(cls) -> Dict[str, int]:
+        """Статистика кэша метаданных путей (hits, misses, stale, size)"""
+        return cls.paths.stats()
+
     @staticmethod
-    def get_certificates(client_path: Path) -> List[Dict]:
-        if not client_path.exists():
-            return []
-            
-        expiry_date = datetime.now() - timedelta(days=CERT_EXPIRY_DAYS)
+    def get_certificates(client_path: Path) -> List[Certificate]:
+        """Контейнеры клиента, новые первыми.
+
+        Один проход os.scandir: тип и mtime берутся из DirEntry (в Windows они
+        приходят вместе со списком папки), отдельных stat() на контейнер нет.
+        """
+        expiry_ts = (datetime.now() - timedelta(days=CERT_EXPIRY_DAYS)).timestamp()
         certs = []
         
-        for cert_dir in client_path.iterdir():
-            if cert_dir.is_dir():
-                mod_time = datetime.fromtimestamp(cert_dir.stat().st_mtime)
-                status = "valid" if mod_time >= expiry_date else "expired"
-                certs.append({
-                    "path": cert_dir,
-                    "name": cert_dir.name,
-                    "status": status,
-                    "date": mod_time.strftime("%d.%m.%Y %H:%M"),
-                    "full_path": str(cert_dir)
-                })
+        try:
+            with os.scandir(client_path) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        mtime = entry.stat().st_mtime
+                        status = "valid" if mtime >= expiry_ts else "expired"
+                        certs.append(Certificate(Path(entry.path), entry.name, mtime, status))
+        except (FileNotFoundError, NotADirectoryError):
+            return []
                 
-        return sorted(certs, key=lambda x: x["path"].stat().st_mtime, reverse=True)
+        certs.sort(key=lambda cert: cert.mtime, reverse=True)
+        return certs
+
+    @classmethod
+    def get_catalog(cls) -> CertificateCatalog:
+        """Локальный каталог клиентов и сертификатов (создаётся при первом обращении)"""
+        if cls._catalog is None:
+            with cls._init_lock:
+                if cls._catalog is None:
+                    cls._catalog = CertificateCatalog(
+                        config.CACHE_FOLDER / "catalog.sqlite3", cls.get_certificates,
+                        max_workers=config.CRAWLER_MAX_WORKERS
+                    )
+        return cls._catalog
+
+    @classmethod
+    def refresh_catalog(cls) -> Dict:
+        """Инкрементальное обновление каталога по mtime папок клиентов"""
+        stats = cls.get_catalog().refresh([NETWORK_FOLDER, ARCHIVE_FOLDER])
+        cls.last_crawl_stats = stats["crawl"]
+        return stats
+
+    @classmethod
+    def search_certificates(cls, query: str, refresh: bool = True) -> List[Dict]:
+        """Поиск контейнеров по имени во всех клиентах через локальный каталог"""
+        return list(cls.iter_certificates(query, refresh))
+
+    @classmethod
+    def iter_certificates(cls, query: str, refresh: bool = True,
+                          cancel: Optional[threading.Event] = None) -> Iterator[Dict]:
+        """search_certificates() с выдачей результатов по мере нахождения.
+
+        Совпадения из пересканированных клиентов выдаются сразу во время
+        обхода, остальные - из каталога после него, без обращения к шаре.
+        Клиенты с совпадениями, сканированные дольше CATALOG_RECHECK_AGE
+        назад, перепроверяются в фоне (не больше CATALOG_RECHECK_LIMIT за
+        поиск): содержимое контейнера могло измениться без изменения mtime
+        папки клиента. cancel прерывает поиск.
+        """
+        expiry_date = datetime.now() - timedelta(days=CERT_EXPIRY_DAYS)
+
+        def result(client: str, name: str, path: Path, mtime: float) -> Dict:
+            mod_time = datetime.fromtimestamp(mtime)
+            return {
+                "path": path,
+                "name": f"{client}/{name}",
+                "status": "valid" if mod_time >= expiry_date else "expired",
+                "date": mod_time.strftime("%d.%m.%Y %H:%M")
+            }
+
+        catalog = cls.get_catalog()
+        found = set()
+        folded = query.casefold()
+        if refresh:
+            stats = catalog.new_stats()
+            for client, certs in catalog.refresh_iter([NETWORK_FOLDER, ARCHIVE_FOLDER], stats, cancel):
+                for cert in certs:
+                    if folded in cert["name"].casefold():
+                        found.add(str(cert["path"]))
+                        yield result(client, cert["name"], cert["path"], cert["mtime"])
+            cls.last_crawl_stats = stats["crawl"]
+
+        stale_before = time.time() - config.CATALOG_RECHECK_AGE
+        stale: Dict[str, None] = {}  # Упорядоченное множество клиентов для перепроверки
+        try:
+            for cert in catalog.iter_search(query):
+                if cancel and cancel.is_set():
+                    return
+                if str(cert["path"]) in found:
+                    continue
+                if cert["scanned_at"] < stale_before and len(stale) < config.CATALOG_RECHECK_LIMIT:
+                    stale[cert["client_path"]] = None
+                yield result(cert["client"], cert["name"], cert["path"], cert["mtime"])
+        finally:
+            if stale:
+                catalog.schedule_rescan(stale)
+
+    @staticmethod
+    def _scan_tree(src: Path) -> Tuple[List[str], List[Tuple[str, os.stat_result]]]:
+        """Вложенные папки и файлы контейнера (относительные пути) за один обход scandir"""
+        dirs, files = [], []
+        stack = [""]
+        while stack:
+            rel = stack.pop()
+            with os.scandir(os.path.join(src, rel)) as entries:
+                for entry in entries:
+                    child = os.path.join(rel, entry.name)
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(child)
+                        stack.append(child)
+                    else:
+                        files.append((child, entry.stat()))
+        return dirs, files
 
     @staticmethod
-    def copy_certificate(src: Path, dest: Path) -> Tuple[bool, str]:
+    def _copy_file(src: str, dest: str, st: os.stat_result):
+        """Самый быстрый доступный способ копирования файла"""
+        if _COPY_FILE2:
+            # Windows + Python 3.12+: CopyFile2, на SMB - копирование на стороне сервера
+            shutil.copy2(src, dest)
+        else:
+            # Без проверок copyfile (samefile, stat обоих файлов): два open и большой буфер;
+            # время изменения - из уже известного stat
+            with open(src, 'rb') as fsrc, open(dest, 'wb') as fdst:
+                shutil.copyfileobj(fsrc, fdst, config.COPY_BUFFER_SIZE)
+            os.utime(dest, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    @classmethod
+    def find_identical(cls, src: Path, crypto_dir: Path, src_files=None,
+                       name: Optional[str] = None) -> Optional[Path]:
+        """Контейнер в crypto_dir с тем же содержимым, что у src (под любым именем).
+
+        Папка хранилища читается один раз; хэши считаются только для
+        контейнеров с теми же именами и размерами файлов.
+        """
+        if src_files is None:
+            src_files = cls._scan_tree(src)[1]
+        src_shape = container_shape(src_files)
+        try:
+            with os.scandir(crypto_dir) as entries:
+                candidates = [Path(entry.path) for entry in entries if entry.is_dir()]
+        except FileNotFoundError:
+            return None
+        
+        src_fingerprint = None
+        # Контейнер с тем же именем проверяется первым
+        name = name or src.name
+        for folder in sorted(candidates, key=lambda folder: folder.name != name):
+            try:
+                files = cls._scan_tree(folder)[1]
+            except OSError:
+                continue
+            if container_shape(files) != src_shape:
+                continue
+            if src_fingerprint is None:
+                src_fingerprint = cls._fingerprints.fingerprint(str(src), src_files)
+            if cls._fingerprints.fingerprint(str(folder), files) == src_fingerprint:
+                return folder
+        return None
+
+    @classmethod
+    def get_source_cache(cls) -> Optional[SourceCache]:
+        """Локальный кэш контейнеров-источников (None, если отключён)"""
+        if cls._source_cache is None and config.SOURCE_CACHE_MAX_MB > 0:
+            with cls._init_lock:
+                if cls._source_cache is None:
+                    cls._source_cache = SourceCache(
+                        config.CACHE_FOLDER / "containers",
+                        config.SOURCE_CACHE_MAX_MB * 1024 * 1024,
+                        cls._copy_file
+                    )
+        return cls._source_cache
+
+    @classmethod
+    def source_cache_stats(cls) -> Dict[str, float]:
+        """Статистика кэша источников (hits, misses, hit_rate, bytes_saved, evictions)"""
+        cache = cls.get_source_cache()
+        return cache.stats() if cache else {}
+
+    @classmethod
+    def install_certificate(cls, src: Path, dest: Path,
+                            progress: Optional[CopyProgress] = None) -> Tuple[bool, str]:
+        """Установка контейнера в папку Crypto Pro сотрудника.
+
+        Источник читается через локальный кэш (с NAS - только список файлов,
+        если контейнер не менялся). Если такой же контейнер уже есть
+        (сравнение отпечатков) - CopySkipped; изменившийся контейнер с тем же
+        именем заменяется.
+        """
         try:
-            if not src.exists():
+            cls.hosts.check_path(dest)
+        except HostOffline as e:
+            return False, str(e)
+        try:
+            tree = cls._scan_tree(src)
+        except FileNotFoundError:
+            return False, f"Источник не существует: {src}"
+        except OSError as e:
+            return False, f"Ошибка чтения источника: {str(e)}"
+        
+        cache = cls.get_source_cache()
+        if cache is None:
+            return cls._install_from(src, src.name, tree, dest, progress)
+        try:
+            with cache.use(src, *tree) as local:
+                return cls._install_from(local, src.name, tree, dest, progress)
+        except (CopyCancelled, CopySkipped):
+            raise
+        except OSError:
+            # Локальный диск недоступен или переполнен - копируем напрямую с NAS
+            return cls._install_from(src, src.name, tree, dest, progress)
+
+    @classmethod
+    def _install_from(cls, src: Path, name: str, tree, dest: Path,
+                      progress: Optional[CopyProgress]) -> Tuple[bool, str]:
+        try:
+            identical = cls.find_identical(src, dest.parent, tree[1], name)
+        except OSError as e:
+            return False, f"Ошибка сравнения контейнеров: {str(e)}"
+        if identical is not None:
+            raise CopySkipped(
+                f"Контейнер {name} уже установлен ({identical.name}), копирование пропущено"
+            )
+        return cls.copy_certificate(src, dest, progress, replace=True, tree=tree)
+
+    @classmethod
+    def copy_certificate(cls, src: Path, dest: Path,
+                         progress: Optional[CopyProgress] = None,
+                         replace: bool = False, tree=None) -> Tuple[bool, str]:
+        """Копирование контейнера; progress.start(файлов, байт) - перед копированием,
+        progress(файл, байт) - после каждого файла.
+
+        Файлы копируются параллельно во временную папку рядом с хранилищем
+        (тот же том), которая в конце переименовывается в dest - недокопированный
+        контейнер никогда не лежит под рабочим именем. replace=True заменяет
+        существующий dest: прежняя версия перемещается в корзину и сообщается
+        через progress.replaced(TrashItem), чтобы отмена могла её вернуть.
+        """
+        tmp = None
+        try:
+            if not cls.paths.exists(src):
                 return False, f"Источник не существует: {src}"
-            if dest.exists():
+            replacing = cls.paths.exists(dest)
+            if replacing and not replace:
                 return False, f"Целевая папка уже существует: {dest}"
-            shutil.copytree(src, dest)
+            
+            dirs, files = tree if tree is not None else cls._scan_tree(src)
+            if progress:
+                progress.start(len(files), sum(st.st_size for _, st in files))
+            if not cls.paths.is_dir(dest.parent):
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                cls.paths.invalidate_path(dest.parent)
+            tmp = dest.parent.parent / f"{TEMP_PREFIX}{dest.name}-{uuid.uuid4().hex[:8]}"
+            # Все папки создаются заранее, родители раньше детей (без makedirs на каждый файл)
+            os.mkdir(tmp)
+            for rel in sorted(dirs, key=lambda d: d.count(os.sep)):
+                os.mkdir(tmp / rel)
+            
+            with ThreadPoolExecutor(max_workers=config.COPY_FILE_WORKERS,
+                                    thread_name_prefix="copy-file") as executor:
+                futures = {
+                    executor.submit(cls._copy_file, os.path.join(src, rel), os.path.join(tmp, rel), st): (rel, st)
+                    for rel, st in files
+                }
+                try:
+                    # progress вызывается из этого потока, по мере готовности файлов
+                    for future in as_completed(futures):
+                        future.result()
+                        rel, st = futures[future]
+                        if progress:
+                            progress(src / rel, st.st_size)
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+            
+            shutil.copystat(src, tmp)
+            if progress:
+                progress.commit()  # Дальше отмена и таймаут уже не действуют
+            if replacing:
+                item = cls._replace(tmp, dest)
+                tmp = None
+                if progress:
+                    progress.replaced(item)
+                return True, f"Сертификат в {dest} заменён новой версией (прежняя - в корзине)"
+            os.rename(tmp, dest)
+            tmp = None
             return True, f"Сертификат скопирован в {dest}"
+        except (CopyCancelled, CopySkipped):
+            raise
+        except FileExistsError:
+            return False, f"Целевая папка уже существует: {dest}"
         except PermissionError as e:
             return False, f"Ошибка доступа: {str(e)}"
         except Exception as e:
             return False, f"Неизвестная ошибка: {str(e)}"
+        finally:
+            cls.paths.invalidate_path(dest)
+            if tmp is not None:
+                shutil.rmtree(tmp, ignore_errors=True)
 
-    @staticmethod
-    def delete_certificate(cert_path: Path) -> Tuple[bool, str]:
+    @classmethod
+    def _replace(cls, new: Path, dest: Path) -> TrashItem:
+        """Замена dest готовой папкой new; прежняя версия - в корзину (не удаляется)"""
+        item = cls.get_trash().move(dest)
         try:
-            if not cert_path.exists():
-                return False, "Сертификат не найден"
-            if not cert_path.is_dir():
-                return False, "Указанный путь не является папкой"
-            shutil.rmtree(cert_path)
-            return True, f"Сертификат {cert_path.name} удален"
+            os.rename(new, dest)
+        except OSError:
+            Trash.restore(item)
+            raise
+        return item
+
+    @classmethod
+    def expiring_report(cls, path: Path, days: int, include_expired: bool = False,
+                        on_progress: Optional[Callable[[int, int], None]] = None,
+                        cancel: Optional[threading.Event] = None) -> Dict:
+        """Отчёт о сертификатах всех клиентов, истекающих в ближайшие days дней"""
+        return write_expiring_report(
+            path, [NETWORK_FOLDER], cls.get_certificates, days, CERT_EXPIRY_DAYS,
+            config.CRAWLER_MAX_WORKERS, include_expired, on_progress, cancel
+        )
+
+    @classmethod
+    def get_trash(cls) -> Trash:
+        """Корзины на шарах (создаются при первом удалении)"""
+        if cls._trash is None:
+            with cls._init_lock:
+                if cls._trash is None:
+                    cls._trash = Trash(
+                        config.TRASH_DIR,
+                        config.TRASH_RETENTION_HOURS * 3600,
+                        config.CACHE_FOLDER / "trash_roots.json",
+                        hosts=cls.hosts
+                    )
+        return cls._trash
+
+    @classmethod
+    def trash_certificate(cls, cert_path: Path) -> Tuple[bool, str, Optional[TrashItem]]:
+        """Удаление контейнера переименованием в корзину (можно восстановить)"""
+        try:
+            cls.hosts.check_path(cert_path)
+            if not cls.paths.exists(cert_path):
+                return False, "Сертификат не найден", None
+            if not cls.paths.is_dir(cert_path):
+                return False, "Указанный путь не является папкой", None
+            item = cls.get_trash().move(cert_path)
+            return True, f"Сертификат {cert_path.name} перемещён в корзину", item
+        except HostOffline as e:
+            return False, str(e), None
         except PermissionError as e:
-            return False, f"Нет прав на удаление: {str(e)}"
+            return False, f"Нет прав на удаление: {str(e)}", None
+        except Exception as e:
+            return False, f"Ошибка удаления: {str(e)}", None
+        finally:
+            # Успех или ошибка - кэшу о пути больше доверять нельзя
+            cls.paths.invalidate_path(cert_path)
+
+    @classmethod
+    def restore_certificate(cls, item: TrashItem) -> Tuple[bool, str]:
+        """Возврат контейнера из корзины"""
+        try:
+            cls.hosts.check_path(item.original)
+            cls.get_trash().restore(item)
+            return True, f"Сертификат {item.original.name} восстановлен"
+        except HostOffline as e:
+            return False, str(e)
+        except FileNotFoundError:
+            return False, f"Сертификат {item.original.name} уже удалён из корзины"
         except Exception as e:
-            return False, f"Ошибка удаления: {str(e)}"
+            return False, f"Ошибка восстановления: {str(e)}"
+        finally:
+            cls.paths.invalidate_path(item.original)
+
+    @classmethod
+    def preview_expired(cls, store: Path = CRYPTO_PRO_PATH) -> Dict:
+        """Просроченные контейнеры хранилища: один проход scandir, размеры - параллельно"""
+        certs = cls.get_certificates(store)
+        expired = [cert for cert in certs if cert.status == "expired"]
+        
+        sizes: Dict[str, int] = {}
+        stats = CrawlStats(config.PURGE_MAX_WORKERS)
+        for folder, size in crawl((cert.path for cert in expired),
+                                  lambda folder: sum(st.st_size for _, st in cls._scan_tree(folder)[1]),
+                                  config.PURGE_MAX_WORKERS, stats):
+            sizes[str(folder)] = size
+        return {
+            "store": store,
+            "total": len(certs),
+            "expired": expired,
+            "bytes": sum(sizes.values()),
+            "errors": stats.errors,
+        }
+
+    @classmethod
+    def purge_certificates(cls, certs: List[Certificate]) -> Dict:
+        """Параллельное удаление (в корзину) с итоговым отчётом"""
+        started = time.perf_counter()
+        report = {"deleted": [], "failed": [], "elapsed": 0.0}
+        with ThreadPoolExecutor(max_workers=config.PURGE_MAX_WORKERS,
+                                thread_name_prefix="purge") as executor:
+            futures = {executor.submit(cls.trash_certificate, cert.path): cert for cert in certs}
+            for future in as_completed(futures):
+                cert = futures[future]
+                success, message, item = future.result()
+                if success:
+                    report["deleted"].append(item)
+                else:
+                    report["failed"].append((cert.name, message))
+        report["elapsed"] = time.perf_counter() - started
+        return report
+
+    @classmethod
+    def restore_certificates(cls, items: List[TrashItem]) -> Dict:
+        """Параллельный возврат из корзины (отмена очистки).
+
+        retry - не восстановленные контейнеры, которые ещё лежат в корзине.
+        """
+        report = {"restored": [], "failed": [], "retry": []}
+        with ThreadPoolExecutor(max_workers=config.PURGE_MAX_WORKERS,
+                                thread_name_prefix="restore") as executor:
+            futures = {executor.submit(cls.restore_certificate, item): item for item in items}
+            for future in as_completed(futures):
+                item = futures[future]
+                success, message = future.result()
+                if success:
+                    report["restored"].append(item)
+                    continue
+                report["failed"].append((item.original.name, message))
+                try:
+                    if cls.get_trash().exists(item):
+                        report["retry"].append(item)
+                except OSError:
+                    report["retry"].append(item)  # Не удалось проверить - оставляем для повтора
+        return report
+
+    @classmethod
+    def delete_certificate(cls, cert_path: Path) -> Tuple[bool, str]:
+        success, message, _ = cls.trash_certificate(cert_path)
+        return success, message
+
+    @classmethod
+    def check_host(cls, pc_name: str) -> Tuple[bool, str]:
+        """Быстрая проверка доступности ПК перед действием с ним"""
+        try:
+            cls.hosts.check(pc_name)
+            return True, ""
+        except HostOffline as e:
+            return False, str(e)
 
     @staticmethod
     def connect_to_pc(pc_name: str) -> bool:
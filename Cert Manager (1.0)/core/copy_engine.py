@@ -0,0 +1,215 @@
+# core/copy_engine.py
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class CopyCancelled(Exception):
+    """Копирование прервано пользователем или по таймауту"""
+
+
+class CopySkipped(Exception):
+    """Копирование не нужно (например, такой контейнер уже установлен)"""
+
+
+class JobState:
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    SKIPPED = "skipped"
+
+    FINAL = (DONE, FAILED, CANCELLED, SKIPPED)
+
+
+class CopyJob:
+    """Задание копирования одного контейнера"""
+    _ids = itertools.count(1)
+
+    def __init__(self, src: Path, dest: Path, timeout: Optional[float] = None,
+                 context: Optional[Dict[str, Any]] = None):
+        self.id = next(self._ids)
+        self.src = src
+        self.dest = dest
+        self.timeout = timeout
+        self.context = context or {}  # Данные вызывающего кода (сотрудник, клиент, redo)
+        self.state = JobState.QUEUED
+        self.message = ""
+        self.files_total = 0
+        self.files_done = 0
+        self.bytes_total = 0
+        self.bytes_done = 0
+        self.current_file = ""
+        self.replaced: Any = None  # Прежняя версия dest, убранная в корзину (для отмены)
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._cancel = threading.Event()
+        self._timed_out = False
+        self._committed = False  # Началась установка результата - отмена и таймаут не действуют
+        self._commit_lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in JobState.FINAL
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def cancel(self):
+        """Запрос отмены: копирование остановится перед следующим файлом"""
+        self._cancel.set()
+
+    def check(self):
+        """Проверка отмены и таймаута (вызывается между файлами)"""
+        if self._cancel.is_set():
+            raise CopyCancelled("Превышено время ожидания" if self._timed_out else "Копирование отменено")
+
+    def commit(self):
+        """Последняя проверка перед переименованием в dest.
+
+        После неё задание уже не может завершиться отменой или таймаутом:
+        установленный контейнер всегда попадает в итог и историю.
+        """
+        with self._commit_lock:
+            self.check()
+            self._committed = True
+
+    def __repr__(self) -> str:
+        return f"CopyJob(#{self.id} {self.src.name} -> {self.dest}, {self.state})"
+
+
+class CopyProgress:
+    """Обратная связь copy_func с заданием: объём работы и готовые файлы"""
+
+    def __init__(self, job: CopyJob, notify: Callable[[CopyJob], None]):
+        self.job = job
+        self._notify = notify
+
+    def start(self, files: int, size: int):
+        """Объём контейнера - из того же списка файлов, по которому идёт копирование"""
+        self.job.files_total = files
+        self.job.bytes_total = size
+        self._notify(self.job)
+        self.job.check()
+
+    def __call__(self, path: Path, size: int):
+        """Файл скопирован"""
+        job = self.job
+        job.files_done += 1
+        job.bytes_done += size
+        job.current_file = path.name
+        self._notify(job)
+        job.check()
+
+    def commit(self):
+        """Перед переименованием в dest (см. CopyJob.commit)"""
+        self.job.commit()
+
+    def replaced(self, item: Any):
+        """Прежняя версия dest перемещена в корзину"""
+        self.job.replaced = item
+
+
+class CopyEngine:
+    """Фоновое копирование контейнеров сертификатов.
+
+    copy_func(src, dest, progress) -> (успех, сообщение) выполняется в пуле
+    потоков; progress - CopyProgress: progress.start(файлов, байт) перед
+    копированием, progress(файл, байт) после каждого файла. CopySkipped
+    завершает задание как пропущенное. Колбэки
+    on_progress/on_finished вызываются из рабочих потоков - UI переводит их
+    в Qt-сигналы.
+    """
+
+    def __init__(self, copy_func: Callable[..., Tuple[bool, str]], max_workers: int = 2,
+                 on_progress: Optional[Callable[[CopyJob], None]] = None,
+                 on_finished: Optional[Callable[[CopyJob], None]] = None):
+        self.copy_func = copy_func
+        self.on_progress = on_progress
+        self.on_finished = on_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="copy")
+        self._lock = threading.Lock()
+        self._jobs: Dict[int, CopyJob] = {}
+
+    def submit(self, src: Path, dest: Path, timeout: Optional[float] = None,
+               context: Optional[Dict[str, Any]] = None) -> CopyJob:
+        """Постановка задания в очередь"""
+        job = CopyJob(src, dest, timeout, context)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job)
+        return job
+
+    def active_jobs(self):
+        """Задания в очереди и в работе"""
+        with self._lock:
+            return [job for job in self._jobs.values() if not job.finished]
+
+    def cancel_all(self):
+        for job in self.active_jobs():
+            job.cancel()
+
+    def shutdown(self):
+        """Отмена всех заданий; зависшие сетевые операции не ждём"""
+        self.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: CopyJob):
+        if job._cancel.is_set():
+            self._finish(job, JobState.CANCELLED, "Копирование отменено")
+            return
+
+        job.state = JobState.RUNNING
+        job.started_at = time.monotonic()
+        watchdog = None
+        if job.timeout:
+            # Зависший SMB-вызов нельзя прервать, но задание завершается по сроку
+            watchdog = threading.Timer(job.timeout, self._expire, (job,))
+            watchdog.daemon = True
+            watchdog.start()
+        try:
+            job.check()
+            progress = CopyProgress(job, lambda job: self._notify(self.on_progress, job))
+            success, message = self.copy_func(job.src, job.dest, progress=progress)
+            self._finish(job, JobState.DONE if success else JobState.FAILED, message)
+        except CopySkipped as e:
+            self._finish(job, JobState.SKIPPED, str(e))
+        except CopyCancelled as e:
+            # copy_func сам убирает временную папку - dest не создаётся
+            self._finish(job, JobState.FAILED if job._timed_out else JobState.CANCELLED, str(e))
+        except Exception as e:
+            self._finish(job, JobState.FAILED, f"Неизвестная ошибка: {str(e)}")
+        finally:
+            if watchdog:
+                watchdog.cancel()
+
+    def _expire(self, job: CopyJob):
+        with job._commit_lock:
+            if job._committed:
+                return  # Результат уже устанавливается - дождёмся его
+            job._timed_out = True
+            job.cancel()
+        self._finish(job, JobState.FAILED, f"Превышено время ожидания ({job.timeout:g} с)")
+
+    def _finish(self, job: CopyJob, state: str, message: str):
+        """Перевод задания в конечное состояние (только один раз)"""
+        with self._lock:
+            if job.finished:
+                return
+            job.state = state
+            job.message = message
+            job.finished_at = time.monotonic()
+            self._jobs.pop(job.id, None)
+        self._notify(self.on_finished, job)
+
+    @staticmethod
+    def _notify(callback: Optional[Callable[[CopyJob], None]], job: CopyJob):
+        if callback:
+            callback(job)
@@ -0,0 +1,87 @@
+# core/crawler.py
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+
+class CrawlStats:
+    """Статистика обхода папок: пропускная способность и задержки"""
+
+    def __init__(self, max_workers: int = 0):
+        self.max_workers = max_workers
+        self.folders = 0
+        self.errors: List[Tuple[str, str]] = []
+        self.latencies: List[float] = []
+        self.elapsed = 0.0
+
+    @property
+    def folders_per_second(self) -> float:
+        return self.folders / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def p95_latency(self) -> float:
+        """95-й перцентиль времени сканирования одной папки, сек"""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    def summary(self) -> str:
+        return (f"папок: {self.folders}, {self.folders_per_second:.1f} папок/с, "
+                f"p95: {self.p95_latency * 1000:.0f} мс, потоков: {self.max_workers}, "
+                f"ошибок: {len(self.errors)}")
+
+
+def crawl(folders: Iterable[Path], scan: Callable[[Path], Any], max_workers: int,
+          stats: Optional[CrawlStats] = None,
+          cancel: Optional[threading.Event] = None) -> Iterator[Tuple[Path, Any]]:
+    """Параллельный обход папок: (папка, scan(папка)) в порядке готовности.
+
+    Одновременно выполняется не больше max_workers сканирований, чтобы не
+    перегружать NAS. Ошибка в папке не прерывает обход - она попадает в
+    stats.errors. Установленный cancel останавливает выдачу новых задач.
+    """
+    max_workers = max(1, max_workers)  # 0 в config (CRAWLER_MAX_WORKERS) - обход в один поток
+    stats = stats if stats is not None else CrawlStats(max_workers)
+    stats.max_workers = max_workers
+    folders = iter(folders)
+
+    def timed_scan(folder: Path):
+        started = time.perf_counter()
+        try:
+            return scan(folder)
+        finally:
+            stats.latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crawler")
+    pending = {}
+    try:
+        while True:
+            # Окно задач ограничено: список папок читается по мере обхода
+            while len(pending) < max_workers * 2 and not (cancel and cancel.is_set()):
+                folder = next(folders, None)
+                if folder is None:
+                    break
+                pending[executor.submit(timed_scan, folder)] = folder
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                folder = pending.pop(future)
+                stats.folders += 1
+                try:
+                    result = future.result()
+                except Exception as e:
+                    stats.errors.append((str(folder), str(e)))
+                    continue
+                yield folder, result
+    finally:
+        # Генератор закрыт раньше времени (отмена) - не ждём оставшиеся сканирования
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+        stats.elapsed += time.perf_counter() - started
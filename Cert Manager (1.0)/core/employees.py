@@ -1,71 +1,525 @@
 # core/employees.py
-import pandas as pd
+import sys
+import hashlib
+import threading
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, Deque, List, Dict, Optional, Tuple
 import time
+from collections import deque
+from bisect import bisect_left
 from functools import lru_cache
 from config import config
+from core.cache import path_cache
+from core.excel_readers import ExcelReader, get_reader
+from core.snapshot import load_snapshot, save_snapshot
+
+class ColumnsError(ValueError):
+    """В файле сотрудников нет обязательных столбцов"""
+
+
+class Employee:
+    """Компактная запись сотрудника: только поля, которые использует приложение"""
+    FIELDS = ('Фамилия', 'ИО', 'ПК', 'Username', 'ВН', 'Каб.')
+    __slots__ = ('last_name', 'initials', 'pc', 'username', 'extension', 'room')
+    _ATTRS = dict(zip(FIELDS, __slots__))
+
+    def __init__(self, last_name, initials, pc, username, extension, room):
+        self.last_name = last_name
+        self.initials = initials
+        self.pc = pc
+        self.username = username
+        self.extension = extension
+        self.room = room
+
+    def get(self, field: str, default=None):
+        """Доступ по имени столбца Excel, как у словаря (None - столбца нет в файле)"""
+        attr = self._ATTRS.get(field)
+        if attr is None:
+            return default
+        value = getattr(self, attr)
+        return default if value is None else value
+
+    def __getitem__(self, field: str):
+        value = self.get(field)
+        if value is None:
+            raise KeyError(field)
+        return value
+
+    def to_dict(self) -> Dict:
+        """Запись в виде словаря {столбец: значение}"""
+        return {field: getattr(self, attr) for field, attr in self._ATTRS.items()
+                if getattr(self, attr) is not None}
+
+    def __repr__(self) -> str:
+        return f"Employee({self.to_dict()!r})"
+
+
+class EmployeeData:
+    """Одно поколение данных: записи и все производные индексы.
+
+    Собирается целиком до публикации и дальше не меняется (кроме сигнатуры
+    файла), поэтому читатели работают со ссылкой без блокировок.
+    """
+    __slots__ = ('records', 'signature', 'digest', 'generation', 'loaded_at', 'load_duration',
+                 'completion_keys', 'completion_values', 'last_name_keys', 'full_name_keys',
+                 'trigrams', 'by_pc', 'by_username', 'report')
+
+    def __init__(self, records: List[Employee], signature: Optional[Tuple[int, int]],
+                 digest: Optional[str], generation: int):
+        self.records = records
+        self.signature = signature  # (mtime, размер) исходного файла
+        self.digest = digest  # sha256 разобранного файла
+        self.generation = generation
+        self.loaded_at = time.time()
+        self.load_duration = 0.0
+        self.report: Dict = {}  # Источник данных и длительность этапов загрузки
+        
+        suggestions = {}
+        for emp in records:
+            last_name = emp.get('Фамилия', '')
+            io = emp.get('ИО', '')
+            if last_name and io:
+                text = f"{last_name} {io}"
+                suggestions.setdefault(EmployeeManager.normalize_name(text), text)
+        
+        # Отсортированные нормализованные "фамилия ио" и подсказки в исходном написании
+        self.completion_keys = sorted(suggestions)
+        self.completion_values = [suggestions[key] for key in self.completion_keys]
+        
+        # Фамилия всегда является началом "фамилия ио", поэтому триграмм
+        # полного имени достаточно для поиска подстроки в обоих ключах
+        self.last_name_keys = []
+        self.full_name_keys = []
+        self.trigrams: Dict[str, List[int]] = {}
+        for idx, emp in enumerate(records):
+            last_name = EmployeeManager.normalize_name(emp.get('Фамилия', ''))
+            full_name = EmployeeManager.normalize_name(f"{emp.get('Фамилия', '')} {emp.get('ИО', '')}")
+            self.last_name_keys.append(last_name)
+            self.full_name_keys.append(full_name)
+            for gram in EmployeeManager._split_trigrams(full_name):
+                self.trigrams.setdefault(gram, []).append(idx)
+        
+        self.by_pc = self._group_by(records, 'ПК')
+        self.by_username = self._group_by(records, 'Username')
+
+    @staticmethod
+    def _group_by(employees: List[Employee], field: str) -> Dict[str, Tuple[Employee, ...]]:
+        """Хеш-индекс без учёта регистра: значение поля -> все сотрудники с ним"""
+        groups: Dict[str, List[Employee]] = {}
+        for emp in employees:
+            key = emp.get(field, '').strip().casefold()
+            if key:
+                groups.setdefault(key, []).append(emp)
+        return {key: tuple(group) for key, group in groups.items()}
+
 
 class EmployeeManager:
-    def __init__(self, excel_path: Path = config.EXCEL_FILE):
+    def __init__(self, excel_path: Path = config.EXCEL_FILE, snapshot_path: Optional[Path] = None,
+                 reader: Optional[ExcelReader] = None):
         self.excel_path = excel_path
-        self._cache = None
-        self._last_load_time = 0
+        self.reader = reader or get_reader(config.EXCEL_READER)
+        self.snapshot_path = snapshot_path or config.CACHE_FOLDER / "employees.snapshot"
+        self._data: Optional[EmployeeData] = None  # Текущее поколение (замена одной ссылкой)
+        self._generation = 0
+        self._lock = threading.Lock()  # Только для писателей: разбор и публикация
+        self._revalidating = False
+        # Сигнатура версии файла, которая не прошла разбор или проверку, и её ошибка:
+        # пока файл не изменится, ошибка повторяется без нового чтения Excel
+        self._failure: Optional[Tuple[Tuple[int, int], Exception]] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._watcher_stop = threading.Event()
+        self._listeners: List[Callable[[EmployeeData], None]] = []
+        self._error_listeners: List[Callable[[str], None]] = []
+        self._pending_errors: Deque[str] = deque(maxlen=50)  # Ошибки, которые ещё некому показать
+        self._errors_lock = threading.Lock()
+        self.cache_hits = 0  # Сколько обращений обслужено из кэша
+        self.cache_misses = 0  # Сколько раз Excel был разобран заново
+        self.snapshot_loads = 0  # Сколько раз данные подняты из локального снимка
         
-    def _load_dataframe(self) -> pd.DataFrame:
-        """Загрузка данных из Excel в DataFrame"""
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        """Сигнатура файла (mtime, размер) для проверки актуальности кэша"""
+        try:
+            # Серия проверок подряд (ввод в поле поиска) - одно обращение к сети
+            stat = path_cache.stat(self.excel_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_source(self) -> bytes:
+        """Чтение файла Excel целиком (одно обращение к сетевой папке)"""
+        try:
+            return self.excel_path.read_bytes()
+        except Exception as e:
+            raise ValueError(f"Ошибка загрузки Excel: {e}")
+
+    def _read_table(self, data: Optional[bytes] = None,
+                    on_header: Optional[Callable[[List[str]], None]] = None) -> Tuple[List[str], List[tuple]]:
+        """Чтение заголовков и нужных столбцов выбранным движком (config.EXCEL_READER)"""
         try:
-            df = pd.read_excel(self.excel_path, dtype=str)
-            df.fillna("", inplace=True)
-            return df
+            return self.reader.read_table(
+                data if data is not None else self.excel_path, Employee.FIELDS, on_header
+            )
+        except ColumnsError:
+            raise
         except Exception as e:
             raise ValueError(f"Ошибка загрузки Excel: {e}")
 
-    def _validate_dataframe(self, df: pd.DataFrame) -> bool:
-        """Проверка структуры DataFrame"""
+    def _validate_columns(self, columns: List[str]) -> bool:
+        """Проверка структуры таблицы"""
         required_fields = ['Фамилия', 'ИО', 'ПК', 'Username']
-        missing = [field for field in required_fields if field not in df.columns]
+        missing = [field for field in required_fields if field not in columns]
         if missing:
-            raise ValueError(f"Отсутствуют обязательные поля: {', '.join(missing)}")
+            raise ColumnsError(f"Отсутствуют обязательные поля: {', '.join(missing)}")
         return True
 
-    def _load_employees(self) -> List[Dict]:
+    def check_columns(self) -> List[str]:
+        """Проверка столбцов файла по строке заголовков, без разбора таблицы"""
+        try:
+            columns = self.reader.read_header(self.excel_path)
+        except Exception as e:
+            raise ValueError(f"Ошибка загрузки Excel: {e}")
+        self._validate_columns(columns)
+        return columns
+
+    @staticmethod
+    def _records_from_rows(rows: List[tuple]) -> List[Employee]:
+        """Перенос строк таблицы в компактные записи с интернированными строками"""
+        intern = sys.intern
+        return [
+            Employee(*(intern(value) if value is not None else None for value in row))
+            for row in rows
+        ]
+
+    def _current(self) -> EmployeeData:
+        """Актуальное поколение данных (повторный разбор только при изменении файла)"""
+        data = self._data
+        if data is None:
+            if self._restore_snapshot():
+                # Холодный старт из локального снимка, сверка с Excel - в фоне
+                if not self.watching:
+                    self._start_revalidation()
+                return self._data
+            with self._lock:
+                if self._data is None:
+                    self._reload(self._file_signature())
+            return self._data
+        
+        if self._revalidating or self.watching:
+            # Свежесть обеспечивает фоновый поток - читатель не ждёт сеть
+            self.cache_hits += 1
+            return data
+        
+        signature = self._file_signature()
+        if signature is not None and signature == data.signature:
+            self.cache_hits += 1
+            return data
+        
+        with self._lock:
+            if self._data is data:
+                self._reload(signature)
+        return self._data
+
+    def _load_employees(self) -> List[Employee]:
         """Загрузка и валидация данных"""
-        df = self._load_dataframe()
-        self._validate_dataframe(df)
-        self._cache = df.to_dict('records')
-        self._last_load_time = time.time()
-        return self._cache
+        return self._current().records
+
+    def _reload(self, signature: Optional[Tuple[int, int]], source: Optional[bytes] = None,
+                digest: Optional[str] = None):
+        """Полный разбор Excel и публикация нового поколения (вызывать под self._lock).
+
+        Один проход: заголовок проверяется сразу после чтения первой строки,
+        и те же разобранные данные идут в записи и индексы.
+        """
+        failure = self._cached_failure(signature)
+        if failure is not None:
+            raise failure
+        phases = {}
+        started = time.perf_counter()
+        mark = started
+        
+        def on_header(columns: List[str]):
+            phases['header'] = time.perf_counter() - mark
+            self._validate_columns(columns)
+        
+        try:
+            if source is None:
+                source = self._read_source()
+                digest = hashlib.sha256(source).hexdigest()
+            phases['read'] = time.perf_counter() - started
+            mark = time.perf_counter()
+            columns, rows = self._read_table(source, on_header)
+        except Exception as e:
+            if signature is not None:
+                self._failure = (signature, e)
+            raise
+        self._failure = None
+        phases['parse'] = time.perf_counter() - mark - phases['header']
+        records = self._records_from_rows(rows)
+        del rows  # Промежуточные кортежи не держим - только компактные записи
+        
+        mark = time.perf_counter()
+        data = EmployeeData(records, signature, digest, self._generation + 1)
+        phases['index'] = time.perf_counter() - mark
+        data.load_duration = time.perf_counter() - started
+        data.report = {'source': 'excel', 'columns': columns, 'phases': phases}
+        self._publish(data)
+        self.cache_misses += 1
+        
+        if signature is not None:
+            self._save_snapshot(data)
+
+    def _cached_failure(self, signature: Optional[Tuple[int, int]]) -> Optional[Exception]:
+        """Ошибка предыдущего разбора той же версии файла (None - файл изменился)"""
+        failure = self._failure
+        if failure is not None and signature is not None and failure[0] == signature:
+            return failure[1]
+        return None
+
+    def _publish(self, data: EmployeeData):
+        """Атомарная замена текущего поколения и уведомление подписчиков"""
+        self._generation = data.generation
+        self._data = data
+        for listener in list(self._listeners):
+            try:
+                listener(data)
+            except Exception as e:
+                self._report_error(f"Ошибка обработчика обновления базы сотрудников: {e}")
+
+    def _restore_snapshot(self) -> bool:
+        """Подъём данных из локального снимка без обращения к Excel"""
+        started = time.perf_counter()
+        payload = load_snapshot(self.snapshot_path, self.excel_path, Employee.FIELDS)
+        if payload is None:
+            return False
+        
+        with self._lock:
+            if self._data is not None:
+                return True
+            records = self._records_from_rows(payload["rows"])  # Интернирование, как после разбора Excel
+            phases = {'snapshot': time.perf_counter() - started}
+            mark = time.perf_counter()
+            data = EmployeeData(records, tuple(payload["signature"]), payload["digest"],
+                                self._generation + 1)
+            phases['index'] = time.perf_counter() - mark
+            data.load_duration = time.perf_counter() - started
+            data.report = {'source': 'snapshot', 'phases': phases}
+            self._publish(data)
+            self.snapshot_loads += 1
+        return True
+
+    def _save_snapshot(self, data: EmployeeData):
+        """Сохранение поколения в локальный снимок"""
+        rows = [tuple(getattr(emp, attr) for attr in Employee.__slots__) for emp in data.records]
+        try:
+            save_snapshot(self.snapshot_path, self.excel_path, Employee.FIELDS,
+                          data.signature, data.digest, rows)
+        except OSError as e:
+            self._report_error(f"Не удалось сохранить снимок базы сотрудников: {e}")
+
+    def _start_revalidation(self):
+        """Фоновая сверка снимка с файлом Excel"""
+        self._revalidating = True
+        threading.Thread(target=self._revalidate, name="employees-revalidate", daemon=True).start()
+
+    def _revalidate(self):
+        """Однократная фоновая сверка"""
+        try:
+            self._poll()
+        except Exception as e:
+            self._report_error(f"Ошибка фоновой проверки базы сотрудников: {e}")
+        finally:
+            self._revalidating = False
+
+    def _poll(self):
+        """Разбор Excel только если файл действительно изменился (mtime/размер, затем sha256)"""
+        data = self._data
+        signature = self._file_signature()
+        if signature is None or (data is not None and signature == data.signature):
+            return
+        if self._cached_failure(signature) is not None:
+            return  # Ошибка этой версии файла уже сообщена
+        
+        source = self._read_source()
+        digest = hashlib.sha256(source).hexdigest()
+        with self._lock:
+            current = self._data
+            if current is not None and digest == current.digest:
+                # Файл перезаписан без изменений - достаточно обновить сигнатуру
+                current.signature = signature
+                self._save_snapshot(current)
+            else:
+                self._reload(signature, source, digest)
+
+    def add_listener(self, listener: Callable[[EmployeeData], None]):
+        """Подписка на публикацию нового поколения (вызывается из фонового потока)"""
+        self._listeners.append(listener)
+
+    def add_error_listener(self, listener: Callable[[str], None]):
+        """Подписка на ошибки фоновой загрузки и проверки файла (вызывается из фонового потока).
+
+        Ошибки, случившиеся до подписки, передаются новому слушателю сразу.
+        """
+        with self._errors_lock:
+            self._error_listeners.append(listener)
+            pending = list(self._pending_errors)
+            self._pending_errors.clear()
+        for message in pending:
+            self._deliver_error(listener, message)
+
+    def _report_error(self, message: str):
+        with self._errors_lock:
+            listeners = list(self._error_listeners)
+            if not listeners:
+                self._pending_errors.append(message)
+        for listener in listeners:
+            self._deliver_error(listener, message)
+
+    def _deliver_error(self, listener: Callable[[str], None], message: str):
+        try:
+            listener(message)
+        except Exception as e:
+            # Сообщение не теряется: его получит следующий слушатель
+            with self._errors_lock:
+                self._pending_errors.append(f"{message} ({e})")
 
     @property
-    def employees(self) -> List[Dict]:
+    def watching(self) -> bool:
+        return self._watcher is not None and self._watcher.is_alive()
+
+    def start_watcher(self, interval: float = config.EMPLOYEE_RELOAD_INTERVAL):
+        """Фоновое отслеживание изменений файла Excel (опрос метаданных)"""
+        if self.watching or interval <= 0:
+            return
+        self._watcher_stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), name="employees-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def stop_watcher(self):
+        """Остановка фонового отслеживания"""
+        self._watcher_stop.set()
+
+    def _watch(self, interval: float):
+        """Цикл опроса: первая проверка сразу, далее раз в interval секунд"""
+        while True:
+            try:
+                if self._data is None:
+                    self._current()
+                self._poll()
+            except Exception as e:
+                self._report_error(f"Ошибка фоновой загрузки базы сотрудников: {e}")
+            if self._watcher_stop.wait(interval):
+                break
+
+    def load(self) -> EmployeeData:
+        """Загрузка данных при старте: снимок или не более одного разбора Excel"""
+        return self._current()
+
+    def refresh(self) -> List[Employee]:
+        """Принудительная перезагрузка данных из Excel"""
+        signature = self._file_signature()
+        with self._lock:
+            self._failure = None  # Явный запрос - повторяем разбор даже без изменения файла
+            self._reload(signature)
+        return self._data.records
+
+    @property
+    def employees(self) -> List[Employee]:
         """Получение актуального списка сотрудников"""
         return self._load_employees()
 
+    @property
+    def generation(self) -> int:
+        """Номер текущего поколения данных (0 - ещё не загружены)"""
+        return self._generation
+
     @staticmethod
     def normalize_name(name: str) -> str:
         """Нормализация имени для поиска"""
         return ' '.join(name.strip().split()).lower()
 
-    def search_by_field(self, query: str, field: str = 'Фамилия') -> List[Dict]:
+    def complete(self, prefix: str, limit: int = config.COMPLETER_LIMIT) -> List[str]:
+        """Подсказки "Фамилия ИО" по началу фамилии за O(log n + k)"""
+        data = self._current()
+        prefix = self.normalize_name(prefix)
+        keys = data.completion_keys
+        values = data.completion_values
+        
+        results = []
+        index = bisect_left(keys, prefix)
+        while index < len(keys) and len(results) < limit and keys[index].startswith(prefix):
+            results.append(values[index])
+            index += 1
+        return results
+
+    @staticmethod
+    def _split_trigrams(text: str) -> set:
+        """Множество триграмм строки"""
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def _candidates(self, data: EmployeeData, query: str) -> List[int]:
+        """Номера строк, которые могут содержать запрос (по триграммному индексу)"""
+        grams = self._split_trigrams(query)
+        if not grams:
+            # Короткий запрос - проверяем все строки, но уже по готовым ключам
+            return list(range(len(data.full_name_keys)))
+        
+        postings = []
+        for gram in grams:
+            posting = data.trigrams.get(gram)
+            if not posting:
+                return []
+            postings.append(posting)
+        
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                break
+        return sorted(candidates)
+
+    def search_by_field(self, query: str, field: str = 'Фамилия') -> List[Employee]:
         """Поиск по конкретному полю"""
         query = self.normalize_name(query)
-        return [emp for emp in self.employees 
+        data = self._current()
+        if field == 'Фамилия':
+            return [data.records[idx] for idx in self._candidates(data, query)
+                    if query in data.last_name_keys[idx]]
+        return [emp for emp in data.records 
                 if query in self.normalize_name(emp.get(field, ""))]
 
-    def search(self, query: str) -> List[Dict]:
-        """Основной метод поиска сотрудников"""
+    def search(self, query: str) -> List[Employee]:
+        """Основной метод поиска сотрудников: точные совпадения, затем по началу, затем подстрока"""
         query = self.normalize_name(query)
-        results = []
+        data = self._current()
+        ranked = []
         
-        for emp in self.employees:
-            last_name = self.normalize_name(emp.get("Фамилия", ""))
-            full_name = self.normalize_name(f"{emp.get('Фамилия', '')} {emp.get('ИО', '')}")
+        for idx in self._candidates(data, query):
+            last_name = data.last_name_keys[idx]
+            full_name = data.full_name_keys[idx]
             
-            if (query in last_name) or (query == full_name):
-                results.append(emp)
-                
-        return results
+            if query == last_name or query == full_name:
+                rank = 0
+            elif full_name.startswith(query):
+                rank = 1
+            elif query in last_name:
+                rank = 2
+            else:
+                continue
+            ranked.append((rank, idx))
+        
+        ranked.sort()
+        return [data.records[idx] for _, idx in ranked]
+
+    def find_by_pc(self, pc_name: str) -> Tuple[Employee, ...]:
+        """Сотрудники, за которыми закреплён ПК (общий ПК - несколько записей)"""
+        return self._current().by_pc.get(pc_name.strip().casefold(), ())
+
+    def find_by_username(self, username: str) -> Tuple[Employee, ...]:
+        """Сотрудники с указанным логином"""
+        return self._current().by_username.get(username.strip().casefold(), ())
 
     @staticmethod
     def format_employee_info(employee: Dict) -> str:
@@ -0,0 +1,169 @@
+# core/excel_readers.py
+from abc import ABC, abstractmethod
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+Source = Union[Path, bytes]
+HeaderCallback = Optional[Callable[[List[str]], None]]
+
+
+def _open(source: Source):
+    """Путь к файлу или уже прочитанное содержимое -> объект для движка"""
+    return BytesIO(source) if isinstance(source, bytes) else source
+
+
+def _cell_to_str(value) -> str:
+    """Значение ячейки -> строка (как pd.read_excel(dtype=str) + fillna(""))"""
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        if value != value:  # NaN
+            return ""
+        if value.is_integer():
+            return str(int(value))
+    return str(value)
+
+
+def _project(header: Sequence, rows: Iterable[Sequence], fields: Sequence[str],
+             on_header: HeaderCallback = None) -> Tuple[List[str], List[tuple]]:
+    """Оставляет только нужные столбцы; отсутствующие в файле столбцы -> None"""
+    columns = [_cell_to_str(name) for name in header]
+    if on_header:
+        on_header(columns)
+    positions = [columns.index(field) if field in columns else None for field in fields]
+    table = []
+    for row in rows:
+        values = []
+        for pos in positions:
+            if pos is None:
+                values.append(None)
+            elif pos < len(row):
+                values.append(_cell_to_str(row[pos]))
+            else:
+                values.append("")
+        if any(values):
+            table.append(tuple(values))
+    return columns, table
+
+
+class ExcelReader(ABC):
+    """Базовый движок чтения базы сотрудников"""
+    name = ""
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return True
+
+    @abstractmethod
+    def read_header(self, source: Source) -> List[str]:
+        """Только строка заголовков (для проверки столбцов)"""
+
+    @abstractmethod
+    def read_table(self, source: Source, fields: Sequence[str],
+                   on_header: HeaderCallback = None) -> Tuple[List[str], List[tuple]]:
+        """Заголовки и строки, спроецированные на fields.
+
+        on_header вызывается со списком столбцов до разбора строк (если движок
+        это позволяет) - исключение из него прерывает чтение.
+        """
+
+
+class PandasReader(ExcelReader):
+    """pandas + openpyxl (прежнее поведение)"""
+    name = "pandas"
+
+    def read_header(self, source: Source) -> List[str]:
+        import pandas as pd
+        return [str(column) for column in pd.read_excel(_open(source), nrows=0).columns]
+
+    def read_table(self, source: Source, fields: Sequence[str],
+                   on_header: HeaderCallback = None) -> Tuple[List[str], List[tuple]]:
+        import pandas as pd
+        if on_header:
+            # Полный разбор не даёт заголовки раньше - отдельное чтение только первой строки
+            on_header(self.read_header(source))
+        header = []
+        df = pd.read_excel(_open(source), dtype=str,
+                           usecols=lambda column: header.append(str(column)) or column in fields)
+        df.fillna("", inplace=True)
+        columns = header
+        data = [df[field].tolist() if field in df.columns else None for field in fields]
+        rows = [
+            tuple(column[i] if column is not None else None for column in data)
+            for i in range(len(df))
+        ]
+        return columns, [row for row in rows if any(row)]
+
+
+class OpenpyxlReader(ExcelReader):
+    """Потоковое чтение openpyxl в режиме read_only, без DataFrame"""
+    name = "openpyxl"
+
+    @staticmethod
+    def _rows(source: Source, max_row: Optional[int] = None):
+        from openpyxl import load_workbook
+        workbook = load_workbook(_open(source), read_only=True, data_only=True)
+        try:
+            yield from workbook.worksheets[0].iter_rows(max_row=max_row, values_only=True)
+        finally:
+            workbook.close()
+
+    def read_header(self, source: Source) -> List[str]:
+        header = next(self._rows(source, max_row=1), ())
+        return [_cell_to_str(name) for name in header]
+
+    def read_table(self, source: Source, fields: Sequence[str],
+                   on_header: HeaderCallback = None) -> Tuple[List[str], List[tuple]]:
+        rows = self._rows(source)
+        header = next(rows, ())
+        return _project(header, rows, fields, on_header)
+
+
+class CalamineReader(ExcelReader):
+    """python-calamine (Rust), если установлен"""
+    name = "calamine"
+
+    @classmethod
+    def is_available(cls) -> bool:
+        try:
+            import python_calamine  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    @staticmethod
+    def _sheet(source: Source):
+        from python_calamine import CalamineWorkbook
+        if isinstance(source, bytes):
+            workbook = CalamineWorkbook.from_filelike(BytesIO(source))
+        else:
+            workbook = CalamineWorkbook.from_path(str(source))
+        return workbook.get_sheet_by_index(0)
+
+    def read_header(self, source: Source) -> List[str]:
+        rows = self._sheet(source).to_python(nrows=1)
+        return [_cell_to_str(name) for name in rows[0]] if rows else []
+
+    def read_table(self, source: Source, fields: Sequence[str],
+                   on_header: HeaderCallback = None) -> Tuple[List[str], List[tuple]]:
+        rows = iter(self._sheet(source).to_python())
+        header = next(rows, ())
+        return _project(header, rows, fields, on_header)
+
+
+READERS: Dict[str, type] = {
+    reader.name: reader for reader in (PandasReader, OpenpyxlReader, CalamineReader)
+}
+
+
+def get_reader(name: str = "auto") -> ExcelReader:
+    """Движок по имени из config; "auto" - calamine, если установлен, иначе openpyxl"""
+    if name == "auto":
+        name = "calamine" if CalamineReader.is_available() else "openpyxl"
+    reader_cls = READERS.get(name)
+    if reader_cls is None:
+        raise ValueError(f"Неизвестный движок чтения Excel: {name}")
+    if not reader_cls.is_available():
+        return OpenpyxlReader()
+    return reader_cls()
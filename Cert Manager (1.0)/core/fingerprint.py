@@ -0,0 +1,51 @@
+# core/fingerprint.py
+import hashlib
+import os
+from typing import Dict, List, Tuple
+
+from core.cache import MISSING, TTLCache
+
+FileList = List[Tuple[str, os.stat_result]]  # (относительный путь, stat)
+
+
+def container_shape(files: FileList) -> Tuple[Tuple[str, int], ...]:
+    """Имена и размеры файлов: дешёвое сравнение без чтения содержимого"""
+    return tuple(sorted((rel.replace(os.sep, "/"), st.st_size) for rel, st in files))
+
+
+class FingerprintCache:
+    """Отпечатки содержимого контейнеров.
+
+    Хэш файла кэшируется по (путь, mtime, размер): неизменившиеся файлы
+    повторно не читаются, в том числе по сети.
+    """
+
+    def __init__(self, maxsize: int = 5000, ttl: float = 3600, chunk_size: int = 1024 * 1024):
+        self._digests = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.chunk_size = chunk_size
+
+    def file_digest(self, path: str, st: os.stat_result) -> str:
+        """sha256 файла (из кэша, если файл не менялся)"""
+        token = (st.st_mtime_ns, st.st_size)
+        digest = self._digests.get(path, token)
+        if digest is MISSING:
+            sha = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(self.chunk_size), b""):
+                    sha.update(chunk)
+            digest = sha.hexdigest()
+            self._digests.put(path, digest, token)
+        return digest
+
+    def fingerprint(self, root: str, files: FileList) -> str:
+        """Отпечаток контейнера: имена, размеры и хэши всех файлов"""
+        sha = hashlib.sha256()
+        for rel, st in sorted(files, key=lambda item: item[0]):
+            sha.update(rel.replace(os.sep, "/").encode("utf-8"))
+            sha.update(b"\0%d\0" % st.st_size)
+            sha.update(self.file_digest(os.path.join(root, rel), st).encode("ascii"))
+            sha.update(b"\n")
+        return sha.hexdigest()
+
+    def stats(self) -> Dict[str, int]:
+        return self._digests.stats()
@@ -0,0 +1,82 @@
+# core/health.py
+import queue
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+ProbeFunc = Callable[[], Tuple[bool, str]]  # -> (успех, сообщение)
+
+
+class ProbeResult:
+    """Итог одной проверки"""
+    __slots__ = ('name', 'ok', 'message', 'latency', 'timed_out')
+
+    def __init__(self, name: str, ok: bool, message: str, latency: float, timed_out: bool = False):
+        self.name = name
+        self.ok = ok
+        self.message = message
+        self.latency = latency
+        self.timed_out = timed_out
+
+    def __repr__(self) -> str:
+        return f"ProbeResult({self.name!r}, ok={self.ok}, {self.latency * 1000:.0f} мс)"
+
+
+class HealthCheck:
+    """Параллельные проверки доступности со своим сроком у каждой.
+
+    Каждая проверка идёт в отдельном daemon-потоке: зависший SMB-вызов не
+    держит ни остальные проверки, ни закрытие приложения. Результаты
+    передаются в on_result по мере готовности (из фонового потока); по
+    истечении срока проверка считается неуспешной, поздний ответ
+    игнорируется.
+    """
+
+    def __init__(self, on_result: Callable[[ProbeResult], None],
+                 on_done: Optional[Callable[[List[ProbeResult], float], None]] = None):
+        self.on_result = on_result
+        self.on_done = on_done
+        self._probes: List[Tuple[str, ProbeFunc, float]] = []
+        self._results: "queue.Queue" = queue.Queue()
+
+    def add(self, name: str, func: ProbeFunc, deadline: float):
+        self._probes.append((name, func, deadline))
+
+    def start(self):
+        """Запуск всех проверок; возвращает управление сразу"""
+        started = time.monotonic()
+        for index, (name, func, _) in enumerate(self._probes):
+            threading.Thread(
+                target=self._run_probe, args=(index, func), name=f"probe-{name}", daemon=True
+            ).start()
+        threading.Thread(target=self._collect, args=(started,), name="health", daemon=True).start()
+
+    def _run_probe(self, index: int, func: ProbeFunc):
+        started = time.monotonic()
+        try:
+            ok, message = func()
+        except Exception as e:
+            ok, message = False, str(e)
+        self._results.put((index, ok, message, time.monotonic() - started))
+
+    def _collect(self, started: float):
+        """Выдача результатов в порядке готовности с учётом сроков"""
+        deadlines = {index: started + deadline for index, (_, _, deadline) in enumerate(self._probes)}
+        results = []
+        while deadlines:
+            timeout = max(0.0, min(deadlines.values()) - time.monotonic())
+            try:
+                index, ok, message, latency = self._results.get(timeout=timeout)
+                if index not in deadlines:
+                    continue  # Ответ после срока - уже засчитан как ошибка
+                del deadlines[index]
+                result = ProbeResult(self._probes[index][0], ok, message, latency)
+            except queue.Empty:
+                index = min(deadlines, key=deadlines.get)
+                del deadlines[index]
+                name, _, deadline = self._probes[index]
+                result = ProbeResult(name, False, f"нет ответа за {deadline:g} с", deadline, timed_out=True)
+            results.append(result)
+            self.on_result(result)
+        if self.on_done:
+            self.on_done(results, time.monotonic() - started)
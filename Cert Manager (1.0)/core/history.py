@@ -0,0 +1,55 @@
+# core/history.py
+from collections import deque
+from typing import Dict, List, Optional
+
+
+class ActionHistory:
+    """Многоуровневая история действий для отмены/повтора.
+
+    Действие - словарь ('type', 'source', 'destination', ...). Новое действие
+    очищает стек повтора; самые старые действия вытесняются после limit.
+    """
+
+    def __init__(self, limit: int = 20):
+        self._undo: deque = deque(maxlen=limit)
+        self._redo: List[Dict] = []
+
+    def record(self, action: Dict):
+        """Новое выполненное действие"""
+        self._undo.append(action)
+        self._redo.clear()
+
+    def peek_undo(self) -> Optional[Dict]:
+        return self._undo[-1] if self._undo else None
+
+    def peek_redo(self) -> Optional[Dict]:
+        return self._redo[-1] if self._redo else None
+
+    def mark_undone(self, action: Dict):
+        """Действие отменено - переходит в стек повтора"""
+        self._remove(self._undo, action)
+        self._redo.append(action)
+
+    def mark_redone(self, action: Dict):
+        """Действие повторено - возвращается в стек отмены"""
+        self._remove(self._redo, action)
+        self._undo.append(action)
+
+    def discard(self, action: Dict):
+        """Действие больше нельзя отменить/повторить"""
+        self._remove(self._undo, action)
+        self._remove(self._redo, action)
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    @staticmethod
+    def _remove(stack, action: Dict):
+        # Сравнение по идентичности: одинаковые по содержимому действия различаются
+        for i in range(len(stack) - 1, -1, -1):
+            if stack[i] is action:
+                del stack[i]
+                return
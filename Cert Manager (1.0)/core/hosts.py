@@ -0,0 +1,185 @@
+# core/hosts.py
+import socket
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from functools import partial
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+UP, DOWN, HALF_OPEN = "up", "down", "half-open"
+
+
+class HostOffline(OSError):
+    """ПК сотрудника недоступен по сети"""
+
+
+def host_of(path: Union[str, Path]) -> Optional[str]:
+    """Имя ПК из UNC-пути (\\\\PC\\c$\\...) или None для локального пути"""
+    text = str(path).replace("/", "\\")
+    if not text.startswith("\\\\"):
+        return None
+    host = text[2:].split("\\", 1)[0]
+    return host or None
+
+
+class _HostState:
+    __slots__ = ('state', 'until', 'down_ttl', 'failures', 'message')
+
+    def __init__(self):
+        self.state = UP
+        self.until = 0.0       # До какого момента состояние считается актуальным
+        self.down_ttl = 0.0    # Текущий срок "выключенного" состояния (растёт при повторных отказах)
+        self.failures = 0
+        self.message = ""
+
+
+class HostMonitor:
+    """Автомат доступности ПК (circuit breaker) перед операциями с \\\\PC\\c$.
+
+    Доступность проверяется быстрым TCP-подключением к порту SMB вместо
+    ожидания таймаута файловой операции. Недоступный ПК запоминается на
+    down_ttl секунд - повторные действия сразу получают HostOffline. После
+    срока одна проверка выполняется заново (half-open), остальные вызовы в
+    это время отказывают без ожидания; при новом отказе срок удваивается
+    до max_down_ttl. Доступный ПК не проверяется повторно up_ttl секунд.
+
+    Имя ПК разрешается в отдельном потоке в пределах того же timeout:
+    зависший DNS не держит вызывающий поток, а повторные проверки того же
+    ПК ждут уже начатое разрешение, не запуская новое.
+    """
+
+    def __init__(self, port: int = 445, timeout: float = 0.5, up_ttl: float = 30,
+                 down_ttl: float = 30, max_down_ttl: float = 300):
+        self.port = port
+        self.timeout = timeout
+        self.up_ttl = up_ttl
+        self.down_ttl = down_ttl
+        self.max_down_ttl = max_down_ttl
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, _HostState] = {}
+        self._resolver = ThreadPoolExecutor(max_workers=4, thread_name_prefix="host-dns")
+        self._resolving: Dict[str, Future] = {}  # Незавершённые getaddrinfo по ПК
+        self.probes = 0
+        self.fast_failures = 0
+
+    def _resolve(self, host: str) -> Future:
+        """getaddrinfo в фоновом потоке (одно на ПК, пока не завершится)"""
+        key = host.casefold()
+        with self._lock:
+            future = self._resolving.get(key)
+            started = future is None
+            if started:
+                future = self._resolver.submit(socket.getaddrinfo, host, self.port, 0, socket.SOCK_STREAM)
+                self._resolving[key] = future
+        if started:
+            future.add_done_callback(partial(self._resolved, key))
+        return future
+
+    def _resolved(self, key: str, future: Future):
+        with self._lock:
+            if self._resolving.get(key) is future:
+                del self._resolving[key]
+
+    def probe(self, host: str) -> Optional[str]:
+        """Проверка порта SMB: None - доступен, иначе текст ошибки"""
+        deadline = time.monotonic() + self.timeout
+        try:
+            addresses = self._resolve(host).result(timeout=self.timeout)
+        except FutureTimeout:
+            return f"имя не разрешено за {self.timeout:g} с"
+        except OSError as e:
+            return e.strerror or str(e)
+        except (UnicodeError, ValueError):
+            # Имя не кодируется в IDNA (пустая или слишком длинная метка)
+            return "некорректное имя ПК"
+
+        error = "имя не разрешается в адрес"
+        for family, kind, proto, _, address in addresses:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return f"нет ответа за {self.timeout:g} с"
+            try:
+                with socket.socket(family, kind, proto) as sock:
+                    sock.settimeout(remaining)
+                    sock.connect(address)
+                    return None
+            except socket.timeout:
+                error = f"нет ответа за {self.timeout:g} с"
+            except OSError as e:
+                error = e.strerror or str(e)
+        return error
+
+    def check(self, host: str):
+        """HostOffline, если ПК недоступен; в закрытом состоянии - без обращения к сети"""
+        key = host.casefold()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._hosts.setdefault(key, _HostState())
+            if entry.state == UP and now < entry.until:
+                return
+            if entry.state == HALF_OPEN or (entry.state == DOWN and now < entry.until):
+                # Идёт повторная проверка другим потоком или срок ещё не истёк
+                self.fast_failures += 1
+                raise HostOffline(self._offline_message(host, entry, now))
+            if entry.state == DOWN:
+                entry.state = HALF_OPEN
+            self.probes += 1
+
+        try:
+            error = self.probe(host)
+        except Exception as e:
+            error = str(e)  # Запись не должна остаться в HALF_OPEN
+        now = time.monotonic()
+        with self._lock:
+            if error is None:
+                entry.state = UP
+                entry.until = now + self.up_ttl
+                entry.down_ttl = 0.0
+                entry.failures = 0
+                return
+            self._trip(entry, now, error)
+            raise HostOffline(self._offline_message(host, entry, now))
+
+    def check_path(self, path: Union[str, Path]):
+        """Проверка ПК, на котором находится path (локальные пути не проверяются)"""
+        host = host_of(path)
+        if host:
+            self.check(host)
+
+    def mark_down(self, host: str, reason: str = ""):
+        """Отказ операции с ПК: следующие действия не ждут таймаута"""
+        with self._lock:
+            entry = self._hosts.setdefault(host.casefold(), _HostState())
+            self._trip(entry, time.monotonic(), reason)
+
+    def reset(self, host: Optional[str] = None):
+        """Сброс состояния (например, после включения ПК)"""
+        with self._lock:
+            if host is None:
+                self._hosts.clear()
+            else:
+                self._hosts.pop(host.casefold(), None)
+
+    def _trip(self, entry: _HostState, now: float, reason: str):
+        entry.failures += 1
+        entry.down_ttl = min(entry.down_ttl * 2 if entry.down_ttl else self.down_ttl, self.max_down_ttl)
+        entry.state = DOWN
+        entry.until = now + entry.down_ttl
+        entry.message = reason
+
+    @staticmethod
+    def _offline_message(host: str, entry: _HostState, now: float) -> str:
+        retry = max(0.0, entry.until - now)
+        reason = f": {entry.message}" if entry.message else ""
+        return f"ПК {host} недоступен (host offline){reason}, повторная проверка через {retry:.0f} с"
+
+    def stats(self) -> Dict[str, int]:
+        """Проверки, мгновенные отказы и число недоступных ПК"""
+        with self._lock:
+            return {
+                "probes": self.probes,
+                "fast_failures": self.fast_failures,
+                "down": sum(1 for entry in self._hosts.values() if entry.state != UP),
+            }
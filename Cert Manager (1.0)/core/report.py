@@ -0,0 +1,119 @@
+# core/report.py
+import csv
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from core.crawler import CrawlStats, crawl
+
+COLUMNS = ["Клиент", "Контейнер", "Изменён", "Истекает", "Дней осталось", "Статус"]
+
+
+def iter_client_folders(roots: Iterable[Path], stats: CrawlStats) -> Iterator[Path]:
+    """Папки клиентов во всех корнях - по мере чтения списка, без загрузки целиком"""
+    for root in roots:
+        try:
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        yield Path(entry.path)
+        except OSError as e:
+            stats.errors.append((str(root), str(e)))
+
+
+def iter_expiring(roots: Iterable[Path], scan_client: Callable[[Path], list], days: int,
+                  expiry_days: int, max_workers: int, stats: CrawlStats,
+                  include_expired: bool = False,
+                  cancel: Optional[threading.Event] = None) -> Iterator[List[list]]:
+    """Строки отчёта по каждому просмотренному клиенту (список может быть пустым):
+    контейнеры, срок которых истекает в ближайшие days дней.
+
+    Срок - то же правило, что у get_certificates: mtime + expiry_days.
+    """
+    now = datetime.now()
+    lifetime = timedelta(days=expiry_days)
+    for folder, certs in crawl(iter_client_folders(roots, stats), scan_client,
+                               max_workers, stats, cancel):
+        rows = []
+        for cert in certs:
+            modified = datetime.fromtimestamp(cert["mtime"])
+            expires = modified + lifetime
+            days_left = (expires - now).days
+            if days_left > days or (days_left < 0 and not include_expired):
+                continue
+            rows.append([
+                folder.name,
+                cert["name"],
+                modified.strftime("%d.%m.%Y %H:%M"),
+                expires.strftime("%d.%m.%Y"),
+                days_left,
+                "истёк" if days_left < 0 else "истекает",
+            ])
+        yield rows
+
+
+class CsvReportWriter:
+    """CSV для Excel: UTF-8 с BOM, разделитель ';'"""
+
+    def __init__(self, path: Path):
+        self._file = open(path, "w", encoding="utf-8-sig", newline="")
+        self._writer = csv.writer(self._file, delimiter=";")
+        self._writer.writerow(COLUMNS)
+
+    def write(self, row: list):
+        self._writer.writerow(row)
+
+    def close(self):
+        self._file.close()
+
+
+class XlsxReportWriter:
+    """XLSX в режиме write_only: строки сразу уходят в файл"""
+
+    def __init__(self, path: Path):
+        from openpyxl import Workbook
+        self.path = path
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet("Истекающие")
+        self._sheet.append(COLUMNS)
+
+    def write(self, row: list):
+        self._sheet.append(row)
+
+    def close(self):
+        self._workbook.save(self.path)
+
+
+def write_expiring_report(path: Path, roots: Iterable[Path], scan_client: Callable[[Path], list],
+                          days: int, expiry_days: int, max_workers: int,
+                          include_expired: bool = False,
+                          on_progress: Optional[Callable[[int, int], None]] = None,
+                          cancel: Optional[threading.Event] = None) -> Dict:
+    """Отчёт об истекающих сертификатах в CSV/XLSX (по расширению path).
+
+    on_progress(клиентов просмотрено, строк записано) вызывается не чаще
+    раза в секунду.
+    """
+    writer = XlsxReportWriter(path) if path.suffix.lower() == ".xlsx" else CsvReportWriter(path)
+    stats = CrawlStats(max_workers)
+    rows = 0
+    last_progress = time.perf_counter()
+    try:
+        for client_rows in iter_expiring(roots, scan_client, days, expiry_days, max_workers,
+                                         stats, include_expired, cancel):
+            for row in client_rows:
+                writer.write(row)
+            rows += len(client_rows)
+            now = time.perf_counter()
+            if on_progress and now - last_progress >= 1:
+                on_progress(stats.folders, rows)
+                last_progress = now
+    finally:
+        writer.close()
+    if on_progress:
+        on_progress(stats.folders, rows)
+    return {"path": path, "rows": rows, "crawl": stats,
+            "cancelled": bool(cancel and cancel.is_set())}
@@ -0,0 +1,65 @@
+# core/snapshot.py
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+SNAPSHOT_MAGIC = b"CMSNAP"
+SNAPSHOT_VERSION = 3  # 2: снимок привязан к пути файла Excel; 3: JSON вместо pickle
+
+
+def save_snapshot(path: Path, source: Path, fields: Sequence[str], signature: Tuple[int, int],
+                  digest: str, rows: List[tuple]) -> None:
+    """Атомарная запись локального снимка таблицы source (через временный файл)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "version": SNAPSHOT_VERSION,
+        "source": str(source),
+        "fields": list(fields),
+        "signature": list(signature),
+        "digest": digest,
+        "rows": rows,
+    }
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    os.replace(tmp_path, path)
+
+
+def _valid_rows(rows, width: int) -> bool:
+    """Строки снимка: списки длины width из строк и None"""
+    return isinstance(rows, list) and all(
+        isinstance(row, list) and len(row) == width
+        and all(value is None or isinstance(value, str) for value in row)
+        for row in rows
+    )
+
+
+def load_snapshot(path: Path, source: Path, fields: Sequence[str]) -> Optional[Dict]:
+    """Чтение снимка; None, если файла нет, он повреждён, другого формата
+    или сделан с другого файла Excel.
+
+    Формат - только данные (JSON): подменённый снимок не может выполнить код,
+    в худшем случае он будет отброшен.
+    """
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                return None
+            payload = json.loads(f.read().decode("utf-8"))
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(payload, dict) or payload.get("version") != SNAPSHOT_VERSION:
+        return None
+    if payload.get("source") != str(source) or payload.get("fields") != list(fields):
+        return None
+    signature = payload.get("signature")
+    if not (isinstance(signature, list) and len(signature) == 2
+            and all(isinstance(value, int) for value in signature)):
+        return None
+    if not isinstance(payload.get("digest"), str) or not _valid_rows(payload.get("rows"), len(fields)):
+        return None
+    payload["signature"] = tuple(signature)
+    return payload
@@ -0,0 +1,232 @@
+# core/source_cache.py
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+FileList = List[Tuple[str, os.stat_result]]  # (относительный путь, stat)
+MANIFEST = "manifest.json"
+
+
+def _sha256(path: Path) -> str:
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class SourceCache:
+    """Локальный кэш контейнеров-источников с NAS (read-through).
+
+    Запись - копия контейнера и manifest.json с размерами и хэшами файлов.
+    Ключ - путь источника, актуальность - по mtime и размерам его файлов.
+    Перед выдачей копия сверяется с манифестом; при превышении max_bytes
+    вытесняются давно не использованные записи (время использования -
+    mtime манифеста).
+
+    Пока из записи копируют (use), она не перезаписывается и не вытесняется:
+    обновление источника ждёт окончания таких копирований.
+    """
+
+    def __init__(self, folder: Path, max_bytes: int,
+                 copy_file: Callable[[str, str, os.stat_result], None]):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.copy_file = copy_file
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._in_use: Dict[str, int] = {}  # Записи, из которых сейчас копируют
+        self._released = threading.Condition(self._lock)
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(src: Path) -> str:
+        return hashlib.sha1(str(src).casefold().encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def signature(files: FileList) -> str:
+        """Версия источника: имена, размеры и mtime файлов"""
+        sha = hashlib.sha1()
+        for rel, st in sorted(files, key=lambda item: item[0]):
+            sha.update(f"{rel}\0{st.st_size}\0{st.st_mtime_ns}\n".encode("utf-8"))
+        return sha.hexdigest()
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    @contextmanager
+    def use(self, src: Path, dirs: List[str], files: FileList) -> Iterator[Path]:
+        """Локальная копия src на время копирования (не вытесняется, пока используется)"""
+        key = self._key(src)
+        data = self._fetch(key, src, dirs, files)
+        try:
+            yield data
+        finally:
+            self._release(key)
+
+    def _acquire(self, key: str):
+        """Аренда записи на время копирования (вызывать под блокировкой ключа)"""
+        with self._lock:
+            self._in_use[key] = self._in_use.get(key, 0) + 1
+
+    def _release(self, key: str):
+        with self._lock:
+            self._in_use[key] -= 1
+            if not self._in_use[key]:
+                del self._in_use[key]
+                self._released.notify_all()
+
+    def _fetch(self, key: str, src: Path, dirs: List[str], files: FileList) -> Path:
+        """Локальная копия src (из кэша или только что сделанная), уже арендованная"""
+        signature = self.signature(files)
+        with self._key_lock(key):
+            entry = self.folder / key
+            manifest = self._read_manifest(entry)
+            if manifest and manifest["signature"] == signature and self._verify(entry, manifest):
+                os.utime(entry / MANIFEST)  # Отметка использования для LRU
+                with self._lock:
+                    self.hits += 1
+                    self.bytes_saved += manifest["bytes"]
+                self._acquire(key)
+                return entry / "data"
+
+            with self._lock:
+                self.misses += 1
+            self._fill(src, entry, dirs, files, signature)
+            self._acquire(key)
+        try:
+            self._evict()
+        except BaseException:
+            self._release(key)
+            raise
+        return entry / "data"
+
+    @staticmethod
+    def _read_manifest(entry: Path) -> Optional[Dict]:
+        try:
+            with open(entry / MANIFEST, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _verify(entry: Path, manifest: Dict) -> bool:
+        """Проверка целостности копии: состав, размеры и sha256 файлов"""
+        data = entry / "data"
+        try:
+            present = {
+                os.path.relpath(os.path.join(root, name), data)
+                for root, _, names in os.walk(data) for name in names
+            }
+            if present != set(manifest["files"]):
+                return False
+            for rel, (size, digest) in manifest["files"].items():
+                path = data / rel
+                if path.stat().st_size != size or _sha256(path) != digest:
+                    return False
+        except OSError:
+            return False
+        return True
+
+    def _fill(self, src: Path, entry: Path, dirs: List[str], files: FileList, signature: str):
+        """Копирование источника в кэш: во временную папку, затем переименование"""
+        tmp = self.folder / f"{entry.name}.tmp-{uuid.uuid4().hex[:8]}"
+        data = tmp / "data"
+        try:
+            data.mkdir(parents=True)
+            for rel in sorted(dirs, key=lambda d: d.count(os.sep)):
+                os.mkdir(data / rel)
+            manifest_files = {}
+            for rel, st in files:
+                self.copy_file(os.path.join(src, rel), os.path.join(data, rel), st)
+                manifest_files[rel] = (st.st_size, _sha256(data / rel))
+            shutil.copystat(src, data)  # mtime папки контейнера как у источника
+
+            manifest = {
+                "source": str(src),
+                "signature": signature,
+                "bytes": sum(size for size, _ in manifest_files.values()),
+                "files": manifest_files,
+            }
+            with open(tmp / MANIFEST, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False)
+
+            # Новые аренды ждут блокировки ключа - дожидаемся окончания текущих
+            with self._lock:
+                while self._in_use.get(entry.name):
+                    self._released.wait()
+            if entry.exists():
+                shutil.rmtree(entry)
+            os.rename(tmp, entry)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        """(последнее использование, байт, папка) всех записей"""
+        result = []
+        with os.scandir(self.folder) as it:
+            for item in it:
+                if not item.is_dir() or ".tmp-" in item.name:
+                    continue
+                manifest = self._read_manifest(Path(item.path))
+                try:
+                    used = os.stat(os.path.join(item.path, MANIFEST)).st_mtime
+                except OSError:
+                    used = 0.0
+                result.append((used, manifest["bytes"] if manifest else 0, Path(item.path)))
+        return result
+
+    def _evict(self):
+        """Вытеснение давно не использованных записей сверх max_bytes.
+
+        Общая блокировка не держится во время работы с диском: запись под
+        блокировкой своего ключа переименовывается во временную папку
+        (новая аренда её уже не получит) и удаляется после.
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        victims = []
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            key_lock = self._key_lock(path.name)
+            if not key_lock.acquire(blocking=False):
+                continue  # Запись сейчас заполняется или выдаётся
+            try:
+                with self._lock:
+                    if path.name in self._in_use:
+                        continue
+                victim = path.with_name(f"{path.name}.tmp-{uuid.uuid4().hex[:8]}")
+                os.rename(path, victim)
+            except OSError:
+                continue
+            finally:
+                key_lock.release()
+            victims.append(victim)
+            total -= size
+        with self._lock:
+            self.evictions += len(victims)
+        for victim in victims:
+            shutil.rmtree(victim, ignore_errors=True)
+
+    def stats(self) -> Dict[str, float]:
+        """Попадания, промахи, доля попаданий и сэкономленные байты"""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "bytes_saved": self.bytes_saved,
+                "evictions": self.evictions,
+            }
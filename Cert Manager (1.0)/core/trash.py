@@ -0,0 +1,195 @@
+# core/trash.py
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from core.hosts import HostMonitor, HostOffline
+
+FILE_ATTRIBUTE_HIDDEN = 0x02
+
+
+class TrashItem:
+    """Папка, перемещённая в корзину"""
+    __slots__ = ('original', 'trashed', 'deleted_at')
+
+    def __init__(self, original: Path, trashed: Path, deleted_at: float):
+        self.original = original
+        self.trashed = trashed
+        self.deleted_at = deleted_at
+
+    def __repr__(self) -> str:
+        return f"TrashItem({str(self.original)!r} -> {self.trashed.name!r})"
+
+
+class Trash:
+    """Корзина на каждой шаре: удаление - переименование в скрытую папку
+    в корне того же тома (без рекурсивного удаления по сети).
+
+    Настоящее удаление делает фоновый sweep по истечении retention секунд.
+    Корни корзин запоминаются в registry_path, чтобы дочищать их после
+    перезапуска; опустевшие и исчезнувшие корни sweep из реестра убирает.
+    Корни на ПК, которые hosts считает недоступными, sweep пропускает.
+    """
+
+    def __init__(self, dir_name: str, retention: float, registry_path: Path,
+                 hosts: Optional[HostMonitor] = None):
+        self.dir_name = dir_name
+        self.retention = retention
+        self.registry_path = registry_path
+        self.hosts = hosts
+        self._lock = threading.Lock()
+        self._roots: Optional[Set[str]] = None
+        self._moving: Dict[str, int] = {}  # Незавершённые перемещения по корням
+        self._moved_at: Dict[str, float] = {}  # Когда в корень последний раз перемещали
+        self._sweeper: Optional[threading.Thread] = None
+        self._sweeper_stop = threading.Event()
+
+    def root_for(self, path: Path) -> Path:
+        """Папка корзины на томе path (\\\\PC\\c$\\<dir_name>)"""
+        return Path(path.anchor) / self.dir_name
+
+    def move(self, path: Path) -> TrashItem:
+        """Перемещение папки в корзину её тома"""
+        root = self.root_for(path)
+        key = str(root)
+        with self._lock:
+            self._moving[key] = self._moving.get(key, 0) + 1
+        try:
+            if not root.is_dir():
+                # Параллельные перемещения (очистка хранилища) могут создавать корень одновременно
+                root.mkdir(exist_ok=True)
+                self._hide(root)
+            deleted_at = time.time()
+            trashed = root / f"{int(deleted_at)}-{uuid.uuid4().hex[:8]}-{path.name}"
+            os.rename(path, trashed)
+        finally:
+            with self._lock:
+                self._moving[key] -= 1
+                if not self._moving[key]:
+                    del self._moving[key]
+                self._moved_at[key] = time.monotonic()
+        self._remember(root)
+        return TrashItem(path, trashed, deleted_at)
+
+    @staticmethod
+    def restore(item: TrashItem):
+        """Возврат папки на прежнее место"""
+        if item.original.exists():
+            raise FileExistsError(f"Папка уже существует: {item.original}")
+        os.rename(item.trashed, item.original)
+
+    @staticmethod
+    def exists(item: TrashItem) -> bool:
+        return item.trashed.exists()
+
+    @staticmethod
+    def _hide(root: Path):
+        if os.name == "nt":
+            import ctypes
+            ctypes.windll.kernel32.SetFileAttributesW(str(root), FILE_ATTRIBUTE_HIDDEN)
+
+    def _load_roots(self) -> Set[str]:
+        if self._roots is None:
+            try:
+                with open(self.registry_path, encoding="utf-8") as f:
+                    self._roots = set(json.load(f))
+            except (OSError, ValueError):
+                self._roots = set()
+        return self._roots
+
+    def _remember(self, root: Path):
+        with self._lock:
+            roots = self._load_roots()
+            if str(root) in roots:
+                return
+            roots.add(str(root))
+            self._save_roots(roots)
+
+    def _forget(self, root: str, scanned_at: float):
+        """Удаление из реестра корня, который был пуст при просмотре в scanned_at"""
+        with self._lock:
+            if self._moving.get(root) or self._moved_at.get(root, 0.0) >= scanned_at:
+                return  # В корень перемещали во время просмотра
+            roots = self._load_roots()
+            if root not in roots:
+                return
+            roots.discard(root)
+            self._moved_at.pop(root, None)
+            self._save_roots(roots)
+
+    def _save_roots(self, roots: Set[str]):
+        """Запись реестра корней (вызывать под self._lock)"""
+        try:
+            self.registry_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.registry_path, "w", encoding="utf-8") as f:
+                json.dump(sorted(roots), f, ensure_ascii=False)
+        except OSError:
+            pass  # Корзина всё равно дочистится, пока приложение запущено
+
+    def sweep(self) -> Dict:
+        """Удаление из всех корзин папок старше retention"""
+        with self._lock:
+            roots = list(self._load_roots())
+        stats = {"purged": 0, "kept": 0, "errors": []}
+        threshold = time.time() - self.retention
+        for root in roots:
+            if self.hosts is not None:
+                try:
+                    self.hosts.check_path(root)
+                except HostOffline as e:
+                    stats["errors"].append((root, str(e)))  # Не ждём таймаута - дочистим позже
+                    continue
+            scanned_at = time.monotonic()
+            try:
+                with os.scandir(root) as entries:
+                    items: List[os.DirEntry] = list(entries)
+            except FileNotFoundError:
+                self._forget(root, scanned_at)  # Корзину удалили вручную
+                continue
+            except OSError as e:
+                stats["errors"].append((root, str(e)))  # ПК выключен - дочистим позже
+                continue
+            left = len(items)
+            for entry in items:
+                try:
+                    deleted_at = int(entry.name.split("-", 1)[0])
+                except ValueError:
+                    continue  # Не наша папка
+                if deleted_at > threshold:
+                    stats["kept"] += 1
+                    continue
+                try:
+                    shutil.rmtree(entry.path)
+                    stats["purged"] += 1
+                    left -= 1
+                except OSError as e:
+                    stats["errors"].append((entry.path, str(e)))
+            if not left:
+                self._forget(root, scanned_at)
+        return stats
+
+    def start_sweeper(self, interval: float):
+        """Фоновая очистка корзин раз в interval секунд"""
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+        self._sweeper_stop.clear()
+        self._sweeper = threading.Thread(
+            target=self._sweep_loop, args=(interval,), name="trash-sweeper", daemon=True
+        )
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        self._sweeper_stop.set()
+
+    def _sweep_loop(self, interval: float):
+        while not self._sweeper_stop.is_set():
+            try:
+                self.sweep()
+            except Exception:
+                pass  # Следующий проход повторит попытку
+            self._sweeper_stop.wait(interval)
@@ -1,35 +1,53 @@
 # ui/copy_view.py
 import re
 import os
-import shutil
 import subprocess
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from PySide6.QtWidgets import QApplication
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
     QLabel, QLineEdit, QPushButton, QTextEdit,
     QCheckBox, QGroupBox, QMessageBox, QCompleter,
-    QDialog, QDialogButtonBox, QListWidget, QListWidgetItem
+    QDialog, QDialogButtonBox, QListWidget, QListWidgetItem, QProgressBar
 )
 from PySide6.QtGui import QIcon, QTextCursor, QColor, QTextCharFormat, QFont, QClipboard
-from PySide6.QtCore import Qt, Signal, QStringListModel
+from PySide6.QtCore import Qt, Signal, QStringListModel, QTimer
 
 from core.employees import EmployeeManager
 from core.certificates import CertificateManager
+from core.copy_engine import CopyEngine, CopyJob, JobState
+from core.history import ActionHistory
 from config import NETWORK_FOLDER, LOG_FOLDER, CERT_EXPIRY_DAYS
 from config import resource_path
+from config import config
 
 class CopyView(QWidget):
     log_signal = Signal(str, str)  # Теперь передаём и тип сообщения
+    employees_reloaded = Signal(int, int, float)  # поколение, число записей, время загрузки
+    completions_ready = Signal(int, list)  # номер запроса, подсказки
+    copy_progress = Signal(object)  # CopyJob после очередного файла
+    copy_finished = Signal(object)  # CopyJob в конечном состоянии
     
     def __init__(self):
         super().__init__()
         self.employee_manager = EmployeeManager()
         self.cert_manager = CertificateManager()
+        self.history = ActionHistory(config.HISTORY_SIZE)
+        self._pending_redo = None  # Повтор, ожидающий завершения копирования
+        # Копирование идёт в фоне, о ходе и итоге сообщают сигналы
+        self.copy_engine = CopyEngine(
+            self.cert_manager.install_certificate,
+            max_workers=config.COPY_WORKERS,
+            on_progress=self.copy_progress.emit,
+            on_finished=self.copy_finished.emit
+        )
         self.setup_ui()
         self.setup_connections()
+        self.employee_manager.start_watcher()
+        self.cert_manager.get_trash().start_sweeper(config.TRASH_SWEEP_INTERVAL)
         self.pending_action = None
         self.log_history = []  # История логов для возможного анализа
         
@@ -213,6 +231,19 @@ class CopyView(QWidget):
         
         main_layout.addLayout(self.execute_layout)
 
+        # Ход фонового копирования (виден, пока есть задания)
+        self.copy_progress_layout = QHBoxLayout()
+        self.copy_progress_bar = QProgressBar()
+        self.copy_progress_bar.setTextVisible(True)
+        self.copy_cancel_btn = QPushButton("Стоп")
+        self.copy_cancel_btn.setStyleSheet(element_style)
+        self.copy_cancel_btn.setToolTip("Прервать копирование")
+        self.copy_progress_layout.addWidget(self.copy_progress_bar, stretch=7)
+        self.copy_progress_layout.addWidget(self.copy_cancel_btn, stretch=2)
+        self.copy_progress_bar.hide()
+        self.copy_cancel_btn.hide()
+        main_layout.addLayout(self.copy_progress_layout)
+
         # Лог-панель
         self.log_output = QTextEdit()
         self.log_output.setReadOnly(True)
@@ -237,26 +268,77 @@ class CopyView(QWidget):
         self.completer.setCaseSensitivity(Qt.CaseInsensitive)
         self.completer.setModel(self.completer_model)
         self.emp_input.setCompleter(self.completer)
+        
+        # Запрос подсказок уходит в фоновый поток после паузы в наборе
+        self._completer_seq = 0
+        self._completer_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="completer")
+        self._completer_timer = QTimer(self)
+        self._completer_timer.setSingleShot(True)
+        self._completer_timer.setInterval(config.COMPLETER_DEBOUNCE_MS)
+        self._completer_timer.timeout.connect(self._request_completions)
+        self.completions_ready.connect(self._apply_completions)
         self.emp_input.textChanged.connect(self.update_completer)
 
     def update_completer(self, text):
         """Обновление списка автодополнения с поиском только по началу фамилии"""
+        self._completer_seq += 1  # Результаты уже отправленных запросов устарели
         if len(text.strip()) < 2:
+            self._completer_timer.stop()
+            return
+        self._completer_timer.start()
+
+    def _request_completions(self):
+        """Отправка запроса подсказок в фоновый поток"""
+        self._completer_seq += 1
+        self._completer_executor.submit(
+            self._compute_completions, self._completer_seq, self.emp_input.text()
+        )
+
+    def _compute_completions(self, seq: int, text: str):
+        """Поиск подсказок (фоновый поток)"""
+        if seq != self._completer_seq:
+            return  # Пока ждали очереди, пользователь продолжил ввод
+        try:
+            # Ищем только по началу фамилии (готовый индекс EmployeeManager)
+            suggestions = self.employee_manager.complete(text)
+        except Exception as e:
+            self.log_signal.emit(f"Ошибка автодополнения: {str(e)}", "error")
+            return
+        self.completions_ready.emit(seq, suggestions)
+
+    def _apply_completions(self, seq: int, suggestions: list):
+        """Применение подсказок к модели: меняем только отличающийся участок списка"""
+        if seq != self._completer_seq:
             return
-            
-        # Ищем только по началу фамилии
-        matches = [emp for emp in self.employee_manager.employees 
-                   if emp.get('Фамилия', '').lower().startswith(text.strip().lower())]
-        
-        suggestions = []
         
-        for emp in matches:
-            last_name = emp.get('Фамилия', '')
-            io = emp.get('ИО', '')
-            if last_name and io:
-                suggestions.append(f"{last_name} {io}")
+        model = self.completer_model
+        current = model.stringList()
+        if current == suggestions:
+            return
         
-        self.completer_model.setStringList(sorted(list(set(suggestions))))
+        common = min(len(current), len(suggestions))
+        head = 0
+        while head < common and current[head] == suggestions[head]:
+            head += 1
+        tail = 0
+        while tail < common - head and current[-1 - tail] == suggestions[-1 - tail]:
+            tail += 1
+        
+        removed = len(current) - head - tail
+        if removed:
+            model.removeRows(head, removed)
+        inserted = suggestions[head:len(suggestions) - tail]
+        if inserted:
+            model.insertRows(head, len(inserted))
+            for offset, text in enumerate(inserted):
+                model.setData(model.index(head + offset), text)
+
+    def shutdown(self):
+        """Остановка фоновых задач вкладки при закрытии приложения"""
+        self.employee_manager.stop_watcher()
+        self._completer_executor.shutdown(wait=False, cancel_futures=True)
+        self.copy_engine.shutdown()
+        self.cert_manager.get_trash().stop_sweeper()
 
     def setup_connections(self):
         """Настройка всех сигналов и слотов"""
@@ -279,6 +361,9 @@ class CopyView(QWidget):
         self.execute_btn.clicked.connect(self.execute_task)
         self.undo_btn.clicked.connect(self.undo_last_action)
         self.redo_btn.clicked.connect(self.redo_last_action)
+        self.copy_cancel_btn.clicked.connect(self.copy_engine.cancel_all)
+        self.copy_progress.connect(self.on_copy_progress)
+        self.copy_finished.connect(self.on_copy_finished)
         
         # Обработка нажатия Enter в полях ввода
         self.emp_input.returnPressed.connect(self.execute_btn.click)
@@ -288,6 +373,21 @@ class CopyView(QWidget):
         # Сигнал для логирования
         self.log_signal.connect(self.log_message)
         
+        # Новое поколение базы сотрудников публикуется из фонового потока
+        self.employee_manager.add_listener(
+            lambda data: self.employees_reloaded.emit(data.generation, len(data.records), data.load_duration)
+        )
+        self.employees_reloaded.connect(self.on_employees_reloaded)
+        # Ошибки фоновой загрузки и проверки столбцов - в журнал, а не в консоль
+        self.employee_manager.add_error_listener(lambda message: self.log_signal.emit(message, "error"))
+        
+    def on_employees_reloaded(self, generation: int, rows: int, duration: float):
+        """Уведомление о новой версии базы сотрудников"""
+        self.log_message(
+            f"База сотрудников загружена: версия {generation}, записей {rows}, {duration:.2f} с",
+            "system"
+        )
+        
     def show_employee_info(self):
         """Отображение информации о сотруднике"""
         name_input = self.emp_input.text().strip()
@@ -423,9 +523,11 @@ class CopyView(QWidget):
             self.log_message("Недостаточно данных для открытия папки (отсутствует ПК или логин)", "error")
             return
         
+        if not self.ensure_host_online(pc_name):
+            return
         path = self.employee_manager.get_crypto_path(pc_name, username)
         try:
-            if path.exists():
+            if self.cert_manager.paths.exists(path):
                 os.startfile(str(path))
                 self.log_message(f"Открыта папка CryptoPro: {path}", "system")
             else:
@@ -514,10 +616,12 @@ class CopyView(QWidget):
         if not pc_name:
             self.log_message("У сотрудника не указан ПК", "error")
             return
+        if not self.ensure_host_online(pc_name):
+            return
             
         path = Path(f"\\\\{pc_name}\\c$")
         try:
-            if path.exists():
+            if self.cert_manager.paths.exists(path):
                 os.startfile(str(path))
                 self.log_message(f"Открыт диск: {path}", "system")
             else:
@@ -527,9 +631,11 @@ class CopyView(QWidget):
 
     def _open_disk_by_pc(self, pc_name: str):
         """Непосредственное открытие диска по имени ПК"""
+        if not self.ensure_host_online(pc_name):
+            return
         path = Path(f"\\\\{pc_name}\\c$")
         try:
-            if path.exists():
+            if self.cert_manager.paths.exists(path):
                 os.startfile(str(path))
                 self.log_message(f"Открыт диск: {path}", "system")
             else:
@@ -766,8 +872,9 @@ class CopyView(QWidget):
         # Логируем попытку подключения
         self.log_message(f"Попытка подключения к ПК: {pc_name}", "system")
         
-        # Вызываем подтверждение подключения без информации о сотруднике
-        self.confirm_connection(pc_name.strip(), None)
+        # Если ПК закреплён ровно за одним сотрудником - показываем его в подтверждении
+        owners = self.employee_manager.find_by_pc(pc_name)
+        self.confirm_connection(pc_name.strip(), owners[0] if len(owners) == 1 else None)
 
     def _perform_connection(self, employee: dict):
         """Фактическое выполнение подключения"""
@@ -785,6 +892,8 @@ class CopyView(QWidget):
     
     def confirm_connection(self, pc_name: str, employee: Optional[dict] = None):
         """Подтверждение подключения с полной информацией"""
+        if not self.ensure_host_online(pc_name):
+            return
         if employee:
             info = (
                 f"{employee.get('Фамилия', '')} {employee.get('ИО', '')} | "
@@ -812,6 +921,13 @@ class CopyView(QWidget):
             else:
                 self.log_message(f"Ошибка подключения к {pc_name}", "error")
 
+    def ensure_host_online(self, pc_name: str) -> bool:
+        """Проверка доступности ПК; недоступный ПК - сообщение без ожидания таймаута SMB"""
+        online, message = self.cert_manager.check_host(pc_name)
+        if not online:
+            self.log_message(message, "error")
+        return online
+
     def log_connection(self, pc_name: str, employee: Optional[dict] = None):
         """Логирование подключения только в интерфейс (без записи в файл)"""
         if employee:
@@ -904,26 +1020,93 @@ class CopyView(QWidget):
             return
             
         dest_path = self.employee_manager.get_crypto_path(pc_name, username) / cert_to_copy["name"]
-        success, message = self.cert_manager.copy_certificate(cert_to_copy["path"], dest_path)
+        # Информация для отмены/повтора сохранится, только когда задание завершится
+        action = {
+            'type': 'copy',
+            'source': cert_to_copy["path"],
+            'destination': dest_path,
+            'employee': employee,
+            'client': client_path.name
+        }
+        self.start_copy_job(action)
+
+    def start_copy_job(self, action: Dict, redo: bool = False):
+        """Постановка копирования в очередь фонового движка"""
+        job = self.copy_engine.submit(
+            action['source'], action['destination'],
+            timeout=config.COPY_TIMEOUT,
+            context={'action': action, 'redo': redo}
+        )
+        self.log_message(f"Копирование {action['client']} ({action['source'].name}) на {action['employee'].get('ПК')}...")
+        self.on_copy_progress(job)
+
+    def on_copy_progress(self, job: CopyJob):
+        """Обновление индикатора копирования"""
+        if job.finished:
+            return
+        self.copy_progress_bar.setMaximum(max(job.files_total, 1))
+        self.copy_progress_bar.setValue(job.files_done)
+        self.copy_progress_bar.setFormat(
+            f"{job.src.name}: %v/%m файлов, {job.bytes_done / 1024:.0f} КБ"
+        )
+        self.copy_progress_bar.show()
+        self.copy_cancel_btn.show()
+
+    def on_copy_finished(self, job: CopyJob):
+        """Итог задания копирования: журнал, отмена/повтор, индикатор"""
+        action = job.context['action']
+        redo = job.context['redo']
         
-        if success:
+        if job.state == JobState.DONE:
             # Сохраняем информацию для отмены/повтора
-            self.last_action = {
-                'type': 'copy',
-                'source': cert_to_copy["path"],
-                'destination': dest_path,
-                'employee': employee,
-                'client': client_path.name
-            }
-            self.undo_btn.setEnabled(True)
-            self.redo_btn.setEnabled(False)
-            
-            self.log_message(f"Сертификат {client_path.name} ({cert_to_copy['name']}) скопирован")
-            
-            # Информация о сотруднике
-            self.display_employee_info(employee)
+            action.pop('previous_restored', None)
+            if job.replaced is not None:
+                action['replaced'] = job.replaced  # Прежняя версия в корзине - отмена вернёт её
+            if redo:
+                self.history.mark_redone(action)
+                self.log_message(f"Повторено: сертификат {action['destination'].name} скопирован")
+            else:
+                self.history.record(action)
+                self.log_message(
+                    f"Сертификат {action['client']} ({action['source'].name}) скопирован за {job.elapsed:.1f} с"
+                )
+                # Информация о сотруднике
+                self.display_employee_info(action['employee'])
+        elif job.state == JobState.SKIPPED:
+            # Такой контейнер уже есть у сотрудника - отменять/повторять нечего
+            self.log_message(job.message, "info")
+            if not redo:
+                self.display_employee_info(action['employee'])
+        elif job.state == JobState.CANCELLED:
+            self.log_message(f"Копирование {action['source'].name} отменено", "info")
         else:
-            self.log_message(f"Ошибка: {message}")
+            prefix = "Ошибка повтора" if redo else "Ошибка"
+            self.log_message(f"{prefix}: {job.message}", "error")
+        
+        if job.state in (JobState.DONE, JobState.SKIPPED):
+            self.log_source_cache_stats()
+        
+        if redo and job.state == JobState.SKIPPED:
+            self.history.discard(action)
+        if redo:
+            self._pending_redo = None
+        self.update_history_buttons()
+        
+        if not self.copy_engine.active_jobs():
+            self.copy_progress_bar.hide()
+            self.copy_cancel_btn.hide()
+
+    def log_source_cache_stats(self):
+        """Эффективность локального кэша контейнеров-источников"""
+        stats = self.cert_manager.source_cache_stats()
+        if not stats:
+            return
+        requests = stats["hits"] + stats["misses"]
+        self.log_message(
+            f"Кэш контейнеров: попаданий {stats['hits']} из {requests} ({stats['hit_rate']:.0%}), "
+            f"не скачано с NAS {stats['bytes_saved'] / 1024:.0f} КБ",
+            "system"
+        )
 
     def open_log_file(self):
         """Открытие лог-файла"""
@@ -1114,47 +1297,86 @@ class CopyView(QWidget):
             cursor.movePosition(QTextCursor.Down, QTextCursor.KeepAnchor, lines_to_remove)
             cursor.removeSelectedText()
 
+    def update_history_buttons(self):
+        """Доступность и подсказки кнопок отмены/повтора по истории"""
+        undo, redo = self.history.peek_undo(), self.history.peek_redo()
+        self.undo_btn.setEnabled(undo is not None)
+        self.redo_btn.setEnabled(redo is not None and self._pending_redo is None)
+        self.undo_btn.setToolTip(
+            f"Отменить: {undo['client']} -> {undo['employee'].get('ПК')}" if undo else "Отменить последнее действие"
+        )
+        self.redo_btn.setToolTip(
+            f"Повторить: {redo['client']} -> {redo['employee'].get('ПК')}" if redo else "Повторить последнее действие"
+        )
+
     def undo_last_action(self):
         """Отмена последнего действия с возможностью повтора"""
-        if not hasattr(self, 'last_action') or not self.last_action:
+        action = self.history.peek_undo()
+        if not action:
             self.log_message("Нет действий для отмены")
             return
             
-        if self.last_action['type'] == 'copy':
-            try:
-                if self.last_action['destination'].exists():
-                    # Сохраняем действие для возможного повтора
-                    self.redo_action = self.last_action.copy()
-                    shutil.rmtree(str(self.last_action['destination']))
-                    self.log_message(f"Отменено: сертификат {self.last_action['destination'].name} удален")
-                    self.undo_btn.setEnabled(False)
-                    self.redo_btn.setEnabled(True)
-                    self.last_action = None
-            except Exception as e:
-                self.log_message(f"Ошибка отмены: {str(e)}")
+        if action['type'] == 'copy':
+            if not self.ensure_host_online(action['employee'].get('ПК', '')):
+                return  # Действие остаётся в истории - отменим, когда ПК будет доступен
+            # Контейнер не удаляется, а переносится в корзину - повтор вернёт его мгновенно
+            success, message, item = self.cert_manager.trash_certificate(action['destination'])
+            if success:
+                action['trash'] = item
+                self.history.mark_undone(action)
+                self.log_message(f"Отменено: сертификат {action['destination'].name} перемещён в корзину")
+                self._restore_previous_version(action)
+            elif not self.cert_manager.paths.exists(action['destination']):
+                self.history.discard(action)
+                self.log_message(f"Сертификат {action['destination'].name} уже удалён", "info")
+            else:
+                self.log_message(f"Ошибка отмены: {message}", "error")
+        self.update_history_buttons()
+
+    def _restore_previous_version(self, action: Dict):
+        """Возврат версии контейнера, которую заменило отменённое копирование"""
+        replaced = action.pop('replaced', None)
+        if replaced is None:
+            return
+        success, message = self.cert_manager.restore_certificate(replaced)
+        if success:
+            action['previous_restored'] = True
+            self.log_message(f"Прежняя версия {replaced.original.name} возвращена из корзины")
+        else:
+            self.log_message(f"Прежняя версия не восстановлена: {message}", "error")
 
     def redo_last_action(self):
         """Повтор последнего отмененного действия"""
-        if not hasattr(self, 'redo_action') or not self.redo_action:
+        action = self.history.peek_redo()
+        if not action:
             self.log_message("Нет действий для повтора")
             return
-            
-        try:
-            success, message = self.cert_manager.copy_certificate(
-                self.redo_action['source'],
-                self.redo_action['destination']
-            )
-            
+        if not self.ensure_host_online(action['employee'].get('ПК', '')):
+            return
+        
+        item = action.pop('trash', None)
+        if item is not None:
+            if action.pop('previous_restored', False):
+                # На месте копии - прежняя версия, возвращённая отменой: снова убираем её в корзину
+                success, message, replaced = self.cert_manager.trash_certificate(action['destination'])
+                if not success:
+                    action['trash'] = item
+                    action['previous_restored'] = True
+                    self.log_message(f"Ошибка повтора: {message}", "error")
+                    return
+                action['replaced'] = replaced
+            success, message = self.cert_manager.restore_certificate(item)
             if success:
-                self.log_message(f"Повторено: сертификат {self.redo_action['destination'].name} скопирован")
-                self.last_action = self.redo_action
-                self.undo_btn.setEnabled(True)
-                self.redo_btn.setEnabled(False)
-                self.redo_action = None
-            else:
-                self.log_message(f"Ошибка повтора: {message}")
-        except Exception as e:
-            self.log_message(f"Ошибка повтора: {str(e)}")
+                self.history.mark_redone(action)
+                self.log_message(f"Повторено: сертификат {action['destination'].name} возвращён из корзины")
+                self.update_history_buttons()
+                return
+            self.log_message(f"{message}, копируем заново", "info")
+        
+        # Корзина уже очищена - повтор через фоновое копирование; история обновится по его завершении
+        self._pending_redo = action
+        self.update_history_buttons()
+        self.start_copy_job(action, redo=True)
             
     def get_laps_password(self):
         """Получение пароля LAPS с умной логикой выбора"""
@@ -1209,11 +1431,8 @@ class CopyView(QWidget):
     def get_laps_by_pc(self, pc_name: str):
         """Получение пароля LAPS по имени ПК"""
         # Поиск сотрудника по ПК
-        employee = None
-        for emp in self.employee_manager.employees:
-            if emp.get('ПК', '') == pc_name:
-                employee = emp
-                break
+        owners = self.employee_manager.find_by_pc(pc_name)
+        employee = owners[0] if owners else None
                 
         self.fetch_and_show_laps(pc_name, employee)
 
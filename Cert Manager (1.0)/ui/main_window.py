@@ -223,4 +223,6 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event):
         """Обработчик закрытия окна"""
         # Можно добавить сохранение настроек или проверку перед закрытием
+        self.copy_tab.shutdown()
+        self.search_tab.shutdown()
         event.accept()
\ No newline at end of file
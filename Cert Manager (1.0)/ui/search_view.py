@@ -2,20 +2,46 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton,
-    QListWidget, QGroupBox, QMessageBox
+    QListWidget, QGroupBox, QMessageBox, QFileDialog, QInputDialog
 )
 from PySide6.QtGui import QIcon, QColor
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, Signal
 from pathlib import Path
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Tuple
 from core.certificates import CertificateManager
+from core.history import ActionHistory
 from config import CRYPTO_PRO_PATH
 import os
 from config import resource_path
+from config import config
 
 class SearchView(QWidget):
+    results_batch = Signal(int, list, int)  # номер поиска, строки, найдено всего
+    search_finished = Signal(int, int, bool, str)  # номер поиска, найдено, отменён, ошибка
+    purge_preview_ready = Signal(object)  # сводка просроченных контейнеров или ошибка
+    purge_finished = Signal(object)  # отчёт об очистке
+    restore_finished = Signal(object, object)  # действие очистки, отчёт о восстановлении
+    report_progress = Signal(int, int)  # клиентов просмотрено, строк записано
+    report_finished = Signal(object)  # итог отчёта об истекающих сертификатах
+    
     def __init__(self):
         super().__init__()
         self.cert_manager = CertificateManager()
+        self.deleted = ActionHistory(config.HISTORY_SIZE)  # Удаления, которые можно отменить
+        
+        # Поиск идёт в фоновом потоке; новый запрос отменяет предыдущий
+        self._search_seq = 0
+        self._search_cancel = threading.Event()
+        self._search_started = 0.0
+        self._first_result_ms = None
+        self._search_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search")
+        self._report_cancel = None  # Событие отмены идущего отчёта
+        self._report_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="report")
+        # Очистка хранилища не занимает очередь поиска
+        self._purge_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="purge")
         self.setup_ui()
         self.setup_connections()
         
@@ -70,8 +96,10 @@ class SearchView(QWidget):
         self.search_btn = QPushButton(QIcon(resource_path("resources/search.png")), "Найти")
         self.client_btn = QPushButton(QIcon(resource_path("resources/client.png")), "Клиенты")
         self.cert_btn = QPushButton(QIcon(resource_path("resources/cert.png")), "Сертификаты")
+        self.report_btn = QPushButton(QIcon(resource_path("resources/log.png")), "Отчёт по срокам")
+        self.report_btn.setToolTip("Сертификаты всех клиентов, истекающие в ближайшие дни (CSV/XLSX)")
         
-        for btn in [self.search_btn, self.client_btn, self.cert_btn]:
+        for btn in [self.search_btn, self.client_btn, self.cert_btn, self.report_btn]:
             btn.setStyleSheet(element_style)
             btn_layout.addWidget(btn)
         
@@ -102,6 +130,22 @@ class SearchView(QWidget):
         """)
         result_layout.addWidget(self.result_list)
         
+        # Ход поиска: счётчик найденного и отмена
+        progress_layout = QHBoxLayout()
+        self.status_label = QLabel()
+        self.status_label.setStyleSheet("color: #aaa; font-size: 12px;")
+        self.cancel_btn = QPushButton("Отмена")
+        self.cancel_btn.setStyleSheet(element_style)
+        self.cancel_btn.setEnabled(False)
+        progress_layout.addWidget(self.status_label, 1)
+        progress_layout.addWidget(self.cancel_btn)
+        result_layout.addLayout(progress_layout)
+        
+        # Статистика обхода папок клиентов (для подбора CRAWLER_MAX_WORKERS)
+        self.crawl_label = QLabel()
+        self.crawl_label.setStyleSheet("color: #888; font-size: 12px;")
+        result_layout.addWidget(self.crawl_label)
+        
         self.delete_btn = QPushButton(QIcon(resource_path("resources/delete.png")), "Удалить")
         self.delete_btn.setStyleSheet("""
             QPushButton {
@@ -112,7 +156,20 @@ class SearchView(QWidget):
                 background-color: #8a3232;
             }
         """)
-        result_layout.addWidget(self.delete_btn)
+        self.restore_btn = QPushButton(QIcon(resource_path("resources/undo.png")), "Восстановить")
+        self.restore_btn.setStyleSheet(element_style)
+        self.restore_btn.setToolTip("Вернуть последний удалённый сертификат из корзины")
+        self.restore_btn.setEnabled(False)
+        
+        self.purge_btn = QPushButton(QIcon(resource_path("resources/clear.png")), "Очистить просроченные")
+        self.purge_btn.setStyleSheet(element_style)
+        self.purge_btn.setToolTip("Переместить в корзину все просроченные сертификаты из хранилища Crypto Pro")
+        
+        delete_layout = QHBoxLayout()
+        delete_layout.addWidget(self.delete_btn, stretch=3)
+        delete_layout.addWidget(self.purge_btn, stretch=2)
+        delete_layout.addWidget(self.restore_btn, stretch=1)
+        result_layout.addLayout(delete_layout)
         
         result_group.setLayout(result_layout)
         layout.addWidget(result_group)
@@ -125,6 +182,17 @@ class SearchView(QWidget):
         self.client_btn.clicked.connect(self.search_clients)
         self.cert_btn.clicked.connect(self.search_certs)
         self.delete_btn.clicked.connect(self.delete_selected)
+        self.restore_btn.clicked.connect(self.restore_deleted)
+        self.purge_btn.clicked.connect(self.purge_expired)
+        self.report_btn.clicked.connect(self.toggle_expiring_report)
+        self.report_progress.connect(self.on_report_progress)
+        self.report_finished.connect(self.on_report_finished)
+        self.purge_preview_ready.connect(self.on_purge_preview)
+        self.purge_finished.connect(self.on_purge_finished)
+        self.restore_finished.connect(self.on_restore_finished)
+        self.cancel_btn.clicked.connect(self.cancel_search)
+        self.results_batch.connect(self.on_results_batch)
+        self.search_finished.connect(self.on_search_finished)
         
     def search_items(self):
         """Общий поиск по клиентам и сертификатам"""
@@ -132,26 +200,7 @@ class SearchView(QWidget):
         if not query:
             self.show_message("Ошибка", "Введите запрос для поиска")
             return
-            
-        clients = self.cert_manager.find_clients(query)
-        certs = self.search_certificates(query)
-        
-        if not clients and not certs:
-            self.show_message("Результат", "Ничего не найдено")
-            return
-            
-        self.result_list.clear()
-        
-        if clients:
-            self.result_list.addItem("=== Клиенты ===")
-            for client in clients:
-                self.result_list.addItem(f"Клиент: {client.name}")
-        
-        if certs:
-            self.result_list.addItem("\n=== Сертификаты ===")
-            for cert in certs:
-                status = "✓" if cert["status"] == "valid" else "✗"
-                self.result_list.addItem(f"{cert['name']} {status} ({cert['date']})")
+        self.start_search("all", query)
 
     def search_clients(self):
         """Поиск только клиентов"""
@@ -159,16 +208,7 @@ class SearchView(QWidget):
         if not query:
             self.show_message("Ошибка", "Введите имя клиента")
             return
-            
-        clients = self.cert_manager.find_clients(query)
-        if not clients:
-            self.show_message("Результат", "Клиенты не найдены")
-            return
-            
-        self.result_list.clear()
-        self.result_list.addItem("Найденные клиенты:")
-        for client in clients:
-            self.result_list.addItem(f"• {client.name}")
+        self.start_search("clients", query)
 
     def search_certs(self):
         """Поиск сертификатов"""
@@ -176,32 +216,124 @@ class SearchView(QWidget):
         if not query:
             self.show_message("Ошибка", "Введите название сертификата")
             return
-            
-        certs = self.search_certificates(query)
-        if not certs:
-            self.show_message("Результат", "Сертификаты не найдены")
-            return
-            
+        self.start_search("certs", query)
+
+    def start_search(self, mode: str, query: str):
+        """Запуск поиска в фоне; результаты приходят порциями в on_results_batch"""
+        self._search_cancel.set()  # Предыдущий поиск больше не нужен
+        self._search_seq += 1
+        self._search_cancel = threading.Event()
+        self._search_mode = mode
+        self._search_started = time.perf_counter()
+        self._first_result_ms = None
+        
         self.result_list.clear()
-        self.result_list.addItem("Найденные сертификаты:")
-        for cert in certs:
-            status = "✓" if cert["status"] == "valid" else "✗"
-            self.result_list.addItem(f"• {cert['name']} {status} ({cert['date']})")
+        self.status_label.setText("Поиск...")
+        self.cancel_btn.setEnabled(True)
+        self._search_executor.submit(self._run_search, self._search_seq, mode, query, self._search_cancel)
+
+    def cancel_search(self):
+        """Отмена текущего поиска (уже найденное остаётся в списке)"""
+        self._search_cancel.set()
+        self.cancel_btn.setEnabled(False)
+        self.status_label.setText("Отмена...")
+
+    def _run_search(self, seq: int, mode: str, query: str, cancel: threading.Event):
+        """Выполнение поиска (фоновый поток): строки отправляются порциями"""
+        if cancel.is_set():
+            return  # Пока ждали очереди, запущен новый поиск
+        batch, found, last_flush = [], 0, time.perf_counter()
+        error = ""
+        try:
+            for text, is_result in self._result_lines(mode, query, cancel):
+                if cancel.is_set():
+                    break
+                batch.append(text)
+                found += is_result
+                now = time.perf_counter()
+                # Первый результат показываем сразу, дальше - порциями
+                if (found == 1 and is_result) or len(batch) >= config.SEARCH_BATCH_SIZE or now - last_flush >= 0.1:
+                    self.results_batch.emit(seq, batch, found)
+                    batch, last_flush = [], now
+            if batch:
+                self.results_batch.emit(seq, batch, found)
+        except Exception as e:
+            error = str(e)
+        self.search_finished.emit(seq, found, cancel.is_set(), error)
+
+    def _result_lines(self, mode: str, query: str, cancel: threading.Event) -> Iterator[Tuple[str, bool]]:
+        """Строки списка результатов: (текст, является ли строка результатом)"""
+        if mode != "certs":
+            clients = self.cert_manager.find_clients(query)
+            if clients:
+                yield ("=== Клиенты ===" if mode == "all" else "Найденные клиенты:"), False
+            for client in clients:
+                yield (f"Клиент: {client.name}" if mode == "all" else f"• {client.name}"), True
+        
+        if mode != "clients":
+            header = "\n=== Сертификаты ===" if mode == "all" else "Найденные сертификаты:"
+            prefix = "" if mode == "all" else "• "
+            for cert in self.cert_manager.iter_certificates(query, cancel=cancel):
+                if header:
+                    yield header, False
+                    header = None
+                status = "✓" if cert["status"] == "valid" else "✗"
+                yield f"{prefix}{cert['name']} {status} ({cert['date']})", True
+
+    def on_results_batch(self, seq: int, lines: list, found: int):
+        """Добавление порции результатов в список"""
+        if seq != self._search_seq:
+            return  # Результаты отменённого поиска
+        if self._first_result_ms is None:
+            self._first_result_ms = (time.perf_counter() - self._search_started) * 1000
+        self.result_list.addItems(lines)
+        self.status_label.setText(f"Найдено: {found}...")
 
-    def search_certificates(self, query: str) -> list:
-        """Поиск сертификатов по запросу"""
-        clients = self.cert_manager.find_clients("")
-        certs = []
-        for client in clients:
-            for cert in self.cert_manager.get_certificates(client):
-                if query.lower() in cert["name"].lower():
-                    certs.append({
-                        "path": cert["path"],
-                        "name": f"{client.name}/{cert['name']}",
-                        "status": cert["status"],
-                        "date": cert["date"]
-                    })
-        return certs
+    def on_search_finished(self, seq: int, found: int, cancelled: bool, error: str):
+        """Итог поиска: счётчик, время до первого результата, статистика обхода"""
+        if seq != self._search_seq:
+            return
+        self.cancel_btn.setEnabled(False)
+        elapsed = time.perf_counter() - self._search_started
+        status = f"Найдено: {found} за {elapsed:.2f} с"
+        if self._first_result_ms is not None:
+            status += f", первый результат: {self._first_result_ms:.0f} мс"
+        if cancelled:
+            status += " (отменено)"
+        self.status_label.setText(status)
+        if self._search_mode != "clients":
+            self.show_crawl_stats(self.cert_manager.last_crawl_stats)
+        
+        if error:
+            self.show_message("Ошибка", f"Ошибка поиска: {error}")
+        elif not found and not cancelled:
+            self.show_message("Результат", {
+                "all": "Ничего не найдено",
+                "clients": "Клиенты не найдены",
+                "certs": "Сертификаты не найдены",
+            }[self._search_mode])
+
+    def show_crawl_stats(self, stats):
+        """Статистика обновления каталога под списком результатов"""
+        if stats is None or not stats.folders:
+            self.crawl_label.setText("Каталог актуален")
+        else:
+            self.crawl_label.setText(f"Обход: {stats.summary()}")
+        if stats is not None and stats.errors:
+            # Недоступные клиенты не прерывают поиск - только перечисляем их
+            failed = "\n".join(f"{path}: {error}" for path, error in stats.errors[:20])
+            self.crawl_label.setToolTip(failed)
+        else:
+            self.crawl_label.setToolTip("")
+
+    def shutdown(self):
+        """Остановка фонового поиска, очистки и отчёта при закрытии приложения"""
+        self._search_cancel.set()
+        self._search_executor.shutdown(wait=False, cancel_futures=True)
+        self._purge_executor.shutdown(wait=False, cancel_futures=True)
+        if self._report_cancel is not None:
+            self._report_cancel.set()
+        self._report_executor.shutdown(wait=False, cancel_futures=True)
 
     def delete_selected(self):
         """Удаление выбранного сертификата"""
@@ -227,13 +359,192 @@ class SearchView(QWidget):
         )
         
         if reply == QMessageBox.Yes:
-            success, message = self.cert_manager.delete_certificate(cert_path)
+            success, message, item = self.cert_manager.trash_certificate(cert_path)
             if success:
+                self.deleted.record({'type': 'delete', 'destination': cert_path, 'trash': item,
+                                     'text': text})
+                self.restore_btn.setEnabled(True)
                 self.result_list.takeItem(self.result_list.row(selected_item))
                 self.show_message("Успех", message)
             else:
                 self.show_message("Ошибка", message)
-                
+
+    def restore_deleted(self):
+        """Возврат последнего удаления (одного сертификата или очистки) из корзины"""
+        action = self.deleted.peek_undo()
+        if not action:
+            return
+        if action['type'] == 'purge':
+            if action.get('restoring'):
+                return
+            # Много переименований по сети - в фоне, итог придёт сигналом
+            action['restoring'] = True
+            self.restore_btn.setEnabled(False)
+            self.status_label.setText(f"Восстановление {len(action['items'])} сертификатов...")
+            self._purge_executor.submit(self._run_restore, action)
+            return
+        
+        success, message = self.cert_manager.restore_certificate(action['trash'])
+        if success or not self.cert_manager.get_trash().exists(action['trash']):
+            self.deleted.discard(action)
+        if success:
+            self.result_list.addItem(action['text'])
+        self.restore_btn.setEnabled(self.deleted.can_undo())
+        self.show_message("Успех" if success else "Ошибка", message)
+
+    def _run_restore(self, action: dict):
+        """Возврат очищенных контейнеров из корзины (фоновый поток)"""
+        try:
+            report = self.cert_manager.restore_certificates(action['items'])
+        except Exception as e:
+            report = {"restored": [], "failed": [("", str(e))], "retry": list(action['items'])}
+        self.restore_finished.emit(action, report)
+
+    def on_restore_finished(self, action: dict, report: dict):
+        """Итог отмены очистки: в истории остаются только не восстановленные"""
+        action['restoring'] = False
+        total = len(action['items'])
+        if report["retry"]:
+            action['items'] = report["retry"]
+        else:
+            self.deleted.discard(action)
+        self.restore_btn.setEnabled(self.deleted.can_undo())
+        
+        message = f"Восстановлено сертификатов: {len(report['restored'])} из {total}"
+        self.status_label.setText(message)
+        if report["failed"]:
+            message += f"\nОшибок: {len(report['failed'])}\n" + "\n".join(
+                f"{name}: {error}" for name, error in report["failed"][:10]
+            )
+            if report["retry"]:
+                message += f"\nОстались в корзине (можно повторить): {len(report['retry'])}"
+        self.show_message("Успех" if report["restored"] else "Ошибка", message)
+
+    def purge_expired(self):
+        """Очистка просроченных сертификатов: сначала сводка в фоне"""
+        self.purge_btn.setEnabled(False)
+        self.status_label.setText("Анализ хранилища Crypto Pro...")
+        self._purge_executor.submit(self._run_purge_preview)
+
+    def _run_purge_preview(self):
+        """Сводка по хранилищу (фоновый поток)"""
+        try:
+            preview = self.cert_manager.preview_expired(CRYPTO_PRO_PATH)
+        except Exception as e:
+            preview = {"error": str(e)}
+        self.purge_preview_ready.emit(preview)
+
+    def on_purge_preview(self, preview: dict):
+        """Подтверждение очистки по сводке"""
+        if "error" in preview:
+            self.purge_btn.setEnabled(True)
+            self.status_label.setText("")
+            self.show_message("Ошибка", f"Хранилище недоступно: {preview['error']}")
+            return
+        
+        expired = preview["expired"]
+        self.status_label.setText(f"Просроченных: {len(expired)} из {preview['total']}")
+        if not expired:
+            self.purge_btn.setEnabled(True)
+            self.show_message("Результат", f"Просроченных сертификатов нет (всего {preview['total']})")
+            return
+        
+        size = preview["bytes"] / 1024
+        size_text = f"{size / 1024:.1f} МБ" if size >= 1024 else f"{size:.0f} КБ"
+        reply = QMessageBox.question(
+            self, "Подтверждение",
+            f"Просроченных сертификатов: {len(expired)} из {preview['total']}\n"
+            f"Объём: {size_text}\n\n"
+            f"Переместить их в корзину?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            self.purge_btn.setEnabled(True)
+            return
+        
+        self.status_label.setText(f"Удаление {len(expired)} сертификатов...")
+        self._purge_executor.submit(self._run_purge, expired)
+
+    def _run_purge(self, expired: list):
+        """Удаление просроченных (фоновый поток)"""
+        try:
+            report = self.cert_manager.purge_certificates(expired)
+        except Exception as e:
+            report = {"deleted": [], "failed": [("", str(e))], "elapsed": 0.0}
+        self.purge_finished.emit(report)
+
+    def on_purge_finished(self, report: dict):
+        """Итоговый отчёт об очистке"""
+        self.purge_btn.setEnabled(True)
+        deleted, failed = report["deleted"], report["failed"]
+        if deleted:
+            self.deleted.record({'type': 'purge', 'items': deleted})
+            self.restore_btn.setEnabled(True)
+        
+        summary = f"Перемещено в корзину: {len(deleted)} за {report['elapsed']:.1f} с"
+        self.status_label.setText(summary)
+        if failed:
+            summary += f"\nОшибок: {len(failed)}\n" + "\n".join(
+                f"{name}: {message}" for name, message in failed[:10]
+            )
+        self.show_message("Ошибка" if failed and not deleted else "Результат", summary)
+
+    def toggle_expiring_report(self):
+        """Запуск отчёта об истекающих сертификатах или его остановка"""
+        if self._report_cancel is not None:
+            self._report_cancel.set()
+            self.report_btn.setEnabled(False)
+            return
+        
+        days, ok = QInputDialog.getInt(
+            self, "Отчёт по срокам", "Истекают в ближайшие (дней):", config.REPORT_DAYS, 1, 3650
+        )
+        if not ok:
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Сохранить отчёт", f"expiring_{days}d.xlsx", "Excel (*.xlsx);;CSV (*.csv)"
+        )
+        if not path:
+            return
+        
+        self._report_cancel = threading.Event()
+        self.report_btn.setText("Остановить отчёт")
+        self.status_label.setText("Отчёт: обход клиентов...")
+        self._report_executor.submit(self._run_report, Path(path), days, self._report_cancel)
+
+    def _run_report(self, path: Path, days: int, cancel: threading.Event):
+        """Построение отчёта (фоновый поток)"""
+        try:
+            result = self.cert_manager.expiring_report(
+                path, days, on_progress=self.report_progress.emit, cancel=cancel
+            )
+        except Exception as e:
+            result = {"error": str(e), "path": path}
+        self.report_finished.emit(result)
+
+    def on_report_progress(self, clients: int, rows: int):
+        self.status_label.setText(f"Отчёт: клиентов {clients}, истекающих {rows}...")
+
+    def on_report_finished(self, result: dict):
+        """Итог отчёта"""
+        self._report_cancel = None
+        self.report_btn.setText("Отчёт по срокам")
+        self.report_btn.setEnabled(True)
+        if "error" in result:
+            self.status_label.setText("")
+            self.show_message("Ошибка", f"Ошибка построения отчёта: {result['error']}")
+            return
+        
+        stats = result["crawl"]
+        summary = (f"Истекающих сертификатов: {result['rows']} "
+                   f"(клиентов просмотрено: {stats.folders}, {stats.elapsed:.1f} с)")
+        if result["cancelled"]:
+            summary += "\nОтчёт остановлен - файл содержит просмотренную часть"
+        if stats.errors:
+            summary += f"\nНедоступно папок: {len(stats.errors)}"
+        self.status_label.setText(summary.split("\n")[0])
+        self.show_message("Отчёт сохранён", f"{summary}\n{result['path']}")
+
     def show_message(self, title, message):
         """Отображение информационного сообщения"""
         msg = QMessageBox(self)